@@ -0,0 +1,100 @@
+# startup_time.py - cold import time of each scheduler entry point
+#
+#   python benchmarks/startup_time.py [--repeat 5] [--json out.json] [--check]
+#
+# Every measurement runs in a fresh interpreter. --check fails when a
+# solver-only or export-only entry point loads the GUI stack.
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = [
+    'scheduler',
+    'scheduler.screening',
+    'scheduler.utils',
+    'scheduler.scenarios',
+    'scheduler.tuning',
+    'scheduler.history',
+    'scheduler.model',
+    'scheduler.pareto',
+    'scheduler.repair',
+    'scheduler.lns',
+    'scheduler.threads',
+    'scheduler.gantt',
+    'scheduler.gui',
+    'scheduler.__main__',
+]
+
+HEAVY = ['PySide6', 'matplotlib', 'matplotlib.backends.backend_pdf', 'pandas', 'gurobipy', 'numpy']
+
+# entry points that must stay free of these modules
+FORBIDDEN = {
+    'scheduler': ['PySide6', 'matplotlib', 'pandas', 'gurobipy'],
+    'scheduler.screening': ['PySide6', 'matplotlib', 'pandas', 'gurobipy'],
+    'scheduler.utils': ['PySide6', 'matplotlib', 'pandas', 'gurobipy'],
+    'scheduler.scenarios': ['PySide6', 'matplotlib', 'pandas', 'gurobipy'],
+    'scheduler.tuning': ['PySide6', 'matplotlib', 'pandas', 'gurobipy'],
+    'scheduler.history': ['PySide6', 'matplotlib', 'pandas', 'gurobipy'],
+    'scheduler.model': ['PySide6', 'matplotlib', 'pandas'],
+    'scheduler.pareto': ['PySide6', 'matplotlib', 'pandas'],
+    'scheduler.repair': ['PySide6', 'matplotlib', 'pandas'],
+    'scheduler.lns': ['PySide6', 'matplotlib', 'pandas'],
+    'scheduler.gui': ['pandas', 'matplotlib.backends.backend_pdf', 'gurobipy'],
+}
+
+PROBE = """
+import sys, time, json
+t = time.perf_counter()
+import {mod}
+dt = time.perf_counter() - t
+print(json.dumps({{'seconds': dt, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(mod, repeat):
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-c', PROBE.format(mod=mod, heavy=HEAVY)],
+                              cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            err = proc.stderr.strip().splitlines()
+            return {'seconds': None, 'loaded': [], 'error': err[-1] if err else 'failed'}
+        res = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or res['seconds'] < best['seconds']:
+            best = res
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold import time per scheduler entry point')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--check', action='store_true', help='fail on forbidden heavy imports')
+    args = parser.parse_args()
+
+    results = {}
+    failed = []
+    for mod in ENTRY_POINTS:
+        res = measure(mod, args.repeat)
+        results[mod] = res
+        if res['seconds'] is None:
+            print(f"{mod:<24} {'n/a':>9}  {res['error']}")
+            continue
+        bad = [m for m in FORBIDDEN.get(mod, []) if m in res['loaded']]
+        if bad:
+            failed.append((mod, bad))
+        print(f"{mod:<24} {res['seconds'] * 1000:8.1f}ms  {', '.join(res['loaded'])}{'  <-- ' + ', '.join(bad) if bad else ''}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
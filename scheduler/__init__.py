@@ -1,5 +1,34 @@
-from .model import solve_multi_machine
-from .gui import MainWindow
-from .gantt import GanttCanvas
-from .threads import SolveThread
-from .utils import setup_logging, export_json, export_pdf
\ No newline at end of file
+# Public names are resolved lazily so that importing one submodule (e.g. the
+# solver) does not pull in Qt, matplotlib or gurobipy for the others.
+import importlib
+
+_EXPORTS = {
+    'solve_multi_machine': 'model',
+    'MainWindow': 'gui',
+    'GanttCanvas': 'gantt',
+    'SolveThread': 'threads',
+    'setup_logging': 'utils',
+    'export_json': 'utils',
+    'export_pdf': 'utils',
+    'solve_pareto': 'pareto',
+    'repair_schedule': 'repair',
+    'improve_lns': 'lns',
+    'screen_instance': 'screening',
+    'run_scenarios': 'scenarios',
+    'tune_corpus': 'tuning',
+    'ScheduleHistory': 'history',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,46 @@
+# exporter.py - report rendering in a separate process (no Qt in here)
+import os
+import traceback
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def render_job(job_id, kind, payload, path, events, cancel_event):
+    # Process target. Renders with the non-interactive Agg backend into a
+    # temporary file and only moves it to `path` once complete, so a cancelled
+    # or failed export never leaves a truncated report behind.
+    # events receives ('progress', id, done, total) / ('done', id, path) /
+    # ('cancelled', id) / ('error', id, message).
+    tmp = f"{path}.part"
+    try:
+        def progress(done, total):
+            if cancel_event.is_set():
+                raise ExportCancelled()
+            events.put(('progress', job_id, done, total))
+
+        if kind == 'json':
+            from .utils import export_json
+            export_json(payload['data'], tmp)
+        else:
+            import matplotlib
+            matplotlib.use('Agg')
+            from .utils import export_pdf, export_compare_pdf
+            if kind == 'pdf':
+                export_pdf(payload['solution'], tmp, progress=progress)
+            elif kind == 'compare_pdf':
+                export_compare_pdf(payload['results'], payload['left_obj'], payload['right_obj'], tmp, progress=progress)
+            else:
+                raise ValueError(f"Unknown export kind: {kind}")
+        if cancel_event.is_set():
+            raise ExportCancelled()
+        os.replace(tmp, path)
+        events.put(('done', job_id, path))
+    except ExportCancelled:
+        events.put(('cancelled', job_id))
+    except Exception as e:
+        events.put(('error', job_id, f"{e}\n{traceback.format_exc()}"))
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
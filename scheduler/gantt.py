@@ -1,9 +1,6 @@
 import matplotlib
-matplotlib.use("QtAgg")
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
-import random
 
 class GanttCanvas(FigureCanvas):
     def __init__(self, parent=None):
@@ -18,7 +15,8 @@ class GanttCanvas(FigureCanvas):
             return
         machines = sorted(list({s['machine'] for s in solution}))
         machine_to_idx = {m:i for i,m in enumerate(machines)}
-        palette = [plt.cm.tab20(i%20) for i in range(len(machines))]
+        cmap = matplotlib.colormaps['tab20']
+        palette = [cmap(i%20) for i in range(len(machines))]
 
         for s in solution:
             if s['start'] is None: continue
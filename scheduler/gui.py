@@ -9,12 +9,13 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor
-from scheduler.threads import SolveThread
+from scheduler.threads import SolveThread, ExportThread
 from scheduler.gantt import GanttCanvas
-from scheduler.utils import setup_logging, export_json, export_pdf, export_compare_pdf
+from scheduler.utils import setup_logging
+from scheduler.validator import validate_schedule
+from scheduler.history import ScheduleHistory, diff_solutions
 from PySide6.QtWidgets import QDialog, QFormLayout, QDoubleSpinBox, QTableWidgetItem, QGridLayout
-from scheduler.threads import CompareThread
-from scheduler.utils import export_json
+from scheduler.threads import CompareThread, ParetoThread
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +43,18 @@ class MainWindow(QMainWindow):
         self.pdf_btn = QPushButton('📄 Export PDF')
         self.pdf_btn.clicked.connect(self.export_pdf)
         self.pdf_btn.setEnabled(False)
+        self.undo_btn = QPushButton('↶ Annuler')
+        self.undo_btn.clicked.connect(self.undo)
+        self.undo_btn.setEnabled(False)
+        self.redo_btn = QPushButton('↷ Rétablir')
+        self.redo_btn.clicked.connect(self.redo)
+        self.redo_btn.setEnabled(False)
         self.obj_selector = QComboBox()
         self.obj_selector.addItems([
             "Weighted completion", 
             "Makespan", 
-            "Multi-criteria (makespan + staff)"
+            "Multi-criteria (makespan + staff)",
+            "Lexicographic (makespan → completion)"
         ])
 
         toolbar.addWidget(QLabel("Objectif:"))
@@ -66,9 +74,13 @@ class MainWindow(QMainWindow):
         self.compare_btn.clicked.connect(self.start_compare)
         toolbar.addWidget(self.compare_btn)
 
+        self.pareto_btn = QPushButton('📈 Front de Pareto')
+        self.pareto_btn.clicked.connect(self.start_pareto)
+        toolbar.addWidget(self.pareto_btn)
 
 
-        for w in [load_json_btn, export_json_btn, self.solve_btn, self.pdf_btn]:
+
+        for w in [load_json_btn, export_json_btn, self.solve_btn, self.pdf_btn, self.undo_btn, self.redo_btn]:
             toolbar.addWidget(w)
         toolbar.addStretch()
         v.addLayout(toolbar)
@@ -92,6 +104,8 @@ class MainWindow(QMainWindow):
         self.res_table = QTableWidget(0,5)
         self.res_table.setHorizontalHeaderLabels(['ID','Machine','Start','End','Staff'])
         self.res_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # Machine / Start can be edited by hand, each edit is a new version
+        self.res_table.itemChanged.connect(self.on_result_edited)
         right.addWidget(self.res_table)
         self.progress = QProgressBar()
         self.progress.setRange(0,0)
@@ -105,8 +119,29 @@ class MainWindow(QMainWindow):
         self.search_input = QLineEdit()
         self.search_input.textChanged.connect(self.search_table)
         footer.addWidget(self.search_input)
+        self.export_progress = QProgressBar()
+        self.export_progress.setVisible(False)
+        footer.addWidget(self.export_progress)
+        self.cancel_export_btn = QPushButton('✖ Annuler export')
+        self.cancel_export_btn.clicked.connect(lambda: self.exporter.cancel())
+        self.cancel_export_btn.setVisible(False)
+        footer.addWidget(self.cancel_export_btn)
         v.addLayout(footer)
 
+        # exports render in a worker process, results come back as signals
+        self.exporter = ExportThread()
+        self.exporter.progress_signal.connect(self.on_export_progress)
+        self.exporter.finished_signal.connect(self.on_export_done)
+        self.exporter.cancelled_signal.connect(self.on_export_cancelled)
+        self.exporter.error_signal.connect(self.on_export_error)
+        self.exporter.start()
+        # ids of queued or running exports; each one ends with exactly one
+        # done / cancelled / error signal
+        self._export_jobs = set()
+
+        # every solved, loaded or hand-edited schedule (undo / redo)
+        self.history = ScheduleHistory()
+
         
 
     # --- Styles ---
@@ -188,6 +223,9 @@ class MainWindow(QMainWindow):
         try:
             with open(path,'r',encoding='utf-8') as f:
                 data = json.load(f)
+            if data and all('start' in t for t in data):
+                self.load_schedule(data)
+                return
             self.table.setRowCount(0)
             for t in data:
                 r = self.table.rowCount()
@@ -206,13 +244,24 @@ class MainWindow(QMainWindow):
 
    
 
+    def load_schedule(self, solution):
+        # a saved solution: check it against the current task table before showing it
+        tasks = self.read_table_tasks() if self.table.rowCount() else None
+        report = validate_schedule(solution, tasks)
+        self.on_solved(solution, None, label='Import')
+        if report['ok']:
+            self.info.setText(f"Planning chargé - {len(solution)} tâches, makespan {report['kpis']['makespan']:.2f}")
+        else:
+            msgs = [v['message'] for v in report['violations']]
+            self.info.setText(f"Planning chargé - {len(msgs)} violation(s)")
+            QMessageBox.warning(self, 'Planning invalide', '\n'.join(msgs[:20]))
+
     def export_json(self):
         tasks = self.read_table_tasks()
         if not tasks: return
         path, _ = QFileDialog.getSaveFileName(self,'Enregistrer JSON','', 'JSON Files (*.json)')
         if not path: return
-        export_json(tasks, path)
-        QMessageBox.information(self,'Export','Exporté avec succès')
+        self.enqueue_export('json', {'data': tasks}, path)
     
     
     def read_table_tasks(self):
@@ -264,7 +313,6 @@ class MainWindow(QMainWindow):
             return default
 
     def start_solve(self):
-        from .model import solve_multi_machine
         tasks = self.read_table_tasks()
         if not tasks: return
         self.solve_btn.setEnabled(False)
@@ -273,7 +321,8 @@ class MainWindow(QMainWindow):
         obj_map = {
             "Weighted completion": "weighted_completion",
             "Makespan": "makespan",
-            "Multi-criteria (makespan + staff)": "multi_criteria"
+            "Multi-criteria (makespan + staff)": "multi_criteria",
+            "Lexicographic (makespan → completion)": "lex_makespan"
         }
         selected_obj = obj_map.get(self.obj_selector.currentText(), "weighted_completion")
         self.thread = SolveThread(tasks, objective=selected_obj)
@@ -283,24 +332,79 @@ class MainWindow(QMainWindow):
 
         self.info.setText(f'Résolution en cours... Objectif: {self.obj_selector.currentText()}')
 
-    def on_solved(self, solution, obj):
+    def on_solved(self, solution, obj, label='Résolution'):
         logger.info('Received solution with %d items', len(solution))
         self.progress.setVisible(False)
         self.solve_btn.setEnabled(True)
         self.pdf_btn.setEnabled(True)
-        self.info.setText(f'Terminé - objectif: {obj:.2f}')
+        self.info.setText(f'Terminé - objectif: {obj:.2f}' if obj is not None else 'Terminé - aucune solution')
+        if solution:
+            self.history.commit(solution, label, obj)
+        self.show_solution(solution, obj)
+
+    def show_solution(self, solution, obj):
         # populate result table
+        self.res_table.blockSignals(True)
         self.res_table.setRowCount(0)
-        for s in sorted(solution, key=lambda x: (x['machine'], x['start'] if x['start'] is not None else 0)):
+        # task ids by row: the id cell only shows str(id)
+        self._row_ids = []
+        for s in sorted(solution, key=lambda x: (str(x['machine']), x['start'] if x['start'] is not None else 0)):
             r = self.res_table.rowCount()
             self.res_table.insertRow(r)
+            self._row_ids.append(s['id'])
             self.res_table.setItem(r,0,QTableWidgetItem(str(s['id'])))
             self.res_table.setItem(r,1,QTableWidgetItem(str(s['machine'])))
             self.res_table.setItem(r,2,QTableWidgetItem(f"{s['start']:.2f}" if s['start'] is not None else ''))
             self.res_table.setItem(r,3,QTableWidgetItem(f"{s['end']:.2f}" if s['end'] is not None else ''))
             self.res_table.setItem(r,4,QTableWidgetItem(str(s.get('staff_group',''))))
-        self.gantt.plot_gantt(solution, title=f'Planning - Obj {obj:.2f}')
+            for c in (0, 3, 4):
+                item = self.res_table.item(r, c)
+                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+        self.res_table.blockSignals(False)
+        self.gantt.plot_gantt(solution, title=f'Planning - Obj {obj:.2f}' if obj is not None else 'Planning')
         self._last_solution = solution
+        self.undo_btn.setEnabled(self.history.can_undo())
+        self.redo_btn.setEnabled(self.history.can_redo())
+
+    def on_result_edited(self, item):
+        tid = self._row_ids[item.row()]
+        if item.column() == 1:
+            change = {'machine': item.text().strip()}
+        else:
+            start = self._to_float(item.text(), default=None)
+            if start is None:
+                QMessageBox.warning(self, 'Modification', f'Début invalide pour {tid}')
+                self._show_version()
+                return
+            change = {'start': start}
+        try:
+            self.history.edit({tid: change}, label=f'Modification {tid}')
+        except (KeyError, ValueError) as e:
+            logger.warning('Edit of %s rejected: %s', tid, e)
+            QMessageBox.warning(self, 'Modification', f'Modification impossible pour {tid}')
+            self._show_version()
+            return
+        solution = self._show_version()
+        report = validate_schedule(solution, self.read_table_tasks() if self.table.rowCount() else None)
+        if report['ok']:
+            self.info.setText(f"Modifié {tid} - makespan {report['kpis']['makespan']:.2f}")
+        else:
+            self.info.setText(f"Modifié {tid} - {len(report['violations'])} violation(s): {report['violations'][0]['message']}")
+
+    def _show_version(self):
+        solution = self.history.get()
+        info = self.history.info(self.history.current)
+        self.show_solution(solution, info['obj'])
+        self.statusBar().showMessage(f"Version {info['version']} : {info['label']}", 5000)
+        return solution
+
+    def undo(self):
+        if self.history.undo() is not None:
+            self._show_version()
+
+    def redo(self):
+        if self.history.redo() is not None:
+            self._show_version()
 
     def on_error(self, msg):
         logger.error('Solver error: %s', msg)
@@ -314,7 +418,51 @@ class MainWindow(QMainWindow):
             return
         path, _ = QFileDialog.getSaveFileName(self,'Exporter PDF','planning.pdf','PDF Files (*.pdf)')
         if not path: return
-        export_pdf(self._last_solution, path)
+        self.enqueue_export('pdf', {'solution': self._last_solution}, path)
+
+    # --- background exports ---
+    def enqueue_export(self, kind, payload, path):
+        job_id = self.exporter.enqueue(kind, payload, path)
+        self._export_jobs.add(job_id)
+        self.export_progress.setRange(0, 0)
+        self.export_progress.setVisible(True)
+        self.cancel_export_btn.setVisible(True)
+        self.statusBar().showMessage(f'Export en file ({len(self._export_jobs)}) : {path}')
+        return job_id
+
+    def on_export_progress(self, job_id, done, total):
+        self.export_progress.setVisible(True)
+        self.cancel_export_btn.setVisible(True)
+        if total:
+            self.export_progress.setRange(0, total)
+            self.export_progress.setValue(done)
+        self.statusBar().showMessage(f'Export #{job_id} : page {done}' + (f'/{total}' if total else ''))
+
+    def _export_idle(self, job_id):
+        self._export_jobs.discard(job_id)
+        if not self._export_jobs:
+            self.export_progress.setVisible(False)
+            self.cancel_export_btn.setVisible(False)
+        else:
+            # next job starts with an unknown page count
+            self.export_progress.setRange(0, 0)
+
+    def on_export_done(self, job_id, path):
+        self._export_idle(job_id)
+        self.statusBar().showMessage(f'Exporté avec succès : {path}', 10000)
+
+    def on_export_cancelled(self, job_id):
+        self._export_idle(job_id)
+        self.statusBar().showMessage(f'Export #{job_id} annulé', 5000)
+
+    def on_export_error(self, job_id, msg):
+        self._export_idle(job_id)
+        logger.error('Export error: %s', msg)
+        QMessageBox.critical(self, 'Erreur export', str(msg))
+
+    def closeEvent(self, event):
+        self.exporter.stop()
+        super().closeEvent(event)
 
     def search_table(self, text):
         t = text.strip().lower()
@@ -359,6 +507,38 @@ class MainWindow(QMainWindow):
         dlg = CompareDialog(self, results)
         dlg.exec()
 
+    def start_pareto(self):
+        tasks = self.read_table_tasks()
+        if not tasks:
+            QMessageBox.warning(self, "Pareto", "Aucune tâche valide.")
+            return
+        self.pareto_btn.setEnabled(False)
+        self.progress.setVisible(True)
+        self.pareto_thread = ParetoThread(tasks, time_limit=60, n_points=8)
+        self.pareto_thread.finished_signal.connect(self.on_pareto_done)
+        self.pareto_thread.error_signal.connect(self.on_pareto_error)
+        self.pareto_thread.start()
+        self.info.setText("Calcul du front de Pareto...")
+
+    def on_pareto_done(self, points):
+        self.progress.setVisible(False)
+        self.pareto_btn.setEnabled(True)
+        if not points:
+            self.info.setText("Front de Pareto: aucune solution")
+            QMessageBox.warning(self, "Pareto", "Aucune solution trouvée.")
+            return
+        self.info.setText(f"Front de Pareto: {len(points)} solutions non dominées")
+        dlg = ParetoDialog(self, points)
+        dlg.exec()
+
+    def on_pareto_error(self, msg):
+        self.pareto_btn.setEnabled(True)
+        self.on_error(msg)
+
+    def use_solution(self, solution, obj):
+        # make a schedule picked elsewhere (e.g. Pareto front) the current one
+        self.on_solved(solution, obj, label='Pareto')
+
 class CompareDialog(QDialog):
     def __init__(self, parent, results: dict):
         super().__init__(parent)
@@ -380,9 +560,11 @@ class CompareDialog(QDialog):
         grid.addWidget(self.gantt_right, 1, 1)
         layout.addLayout(grid, 3)
 
-        self.kpi_table = QTableWidget(0, 5)
-        self.kpi_table.setHorizontalHeaderLabels(['ID', f'Start ({left_obj})', f'Start ({right_obj})', 'Duration', 'Delta Start'])
+        self.kpi_table = QTableWidget(0, 6)
+        self.kpi_table.setHorizontalHeaderLabels(['ID', f'Start ({left_obj})', f'Start ({right_obj})', 'Duration', 'Delta Start', 'Machine'])
         layout.addWidget(self.kpi_table, 2)
+        self.diff_label = QLabel('')
+        layout.addWidget(self.diff_label)
 
         footer = QHBoxLayout()
         export_left_btn = QPushButton(f'Export {left_obj} JSON')
@@ -408,8 +590,8 @@ class CompareDialog(QDialog):
         path, _ = QFileDialog.getSaveFileName(self, 'Exporter PDF comparatif','comparatif.pdf','PDF Files (*.pdf)')
         if not path:
             return
-        export_compare_pdf(results, left_obj, right_obj, path)
-        QMessageBox.information(self, 'Export PDF', 'PDF comparatif exporté avec succès')
+        payload = {'results': {k: results[k] for k in (left_obj, right_obj)}, 'left_obj': left_obj, 'right_obj': right_obj}
+        self.parent().enqueue_export('compare_pdf', payload, path)
 
     def populate(self, results, left_obj, right_obj):
         left_sol, left_val = results[left_obj]
@@ -417,36 +599,94 @@ class CompareDialog(QDialog):
         self.gantt_left.plot_gantt(left_sol, title=f'{left_obj} - Obj {left_val:.2f}' if left_val is not None else left_obj)
         self.gantt_right.plot_gantt(right_sol, title=f'{right_obj} - Obj {right_val:.2f}' if right_val is not None else right_obj)
 
-        # build map id->start for quick compare
-        map_left = {s['id']: s for s in (left_sol or [])}
-        map_right = {s['id']: s for s in (right_sol or [])}
-        ids = sorted(set(map_left.keys()).union(map_right.keys()))
-        self.kpi_table.setRowCount(0)
-        for tid in ids:
-            l = map_left.get(tid, {})
-            r = map_right.get(tid, {})
-            lstart = l.get('start')
-            rstart = r.get('start')
-            dur = l.get('duration') or r.get('duration') or ''
-            delta = ''
-            if lstart is not None and rstart is not None:
-                delta = f"{(rstart - lstart):.2f}"
-            rr = self.kpi_table.rowCount()
-            self.kpi_table.insertRow(rr)
-            self.kpi_table.setItem(rr, 0, QTableWidgetItem(str(tid)))
-            self.kpi_table.setItem(rr, 1, QTableWidgetItem(f"{lstart:.2f}" if lstart is not None else ''))
-            self.kpi_table.setItem(rr, 2, QTableWidgetItem(f"{rstart:.2f}" if rstart is not None else ''))
-            self.kpi_table.setItem(rr, 3, QTableWidgetItem(str(dur)))
-            self.kpi_table.setItem(rr, 4, QTableWidgetItem(str(delta)))
+        # only the tasks that differ are listed
+        diff = diff_solutions(left_sol, right_sol)
+        changes = sorted(diff['changes'], key=lambda d: str(d['id']))
+        self.kpi_table.setRowCount(len(changes))
+        for rr, d in enumerate(changes):
+            machine = d['machine_b'] or d['machine_a'] or ''
+            if d['machine_a'] is not None and d['machine_b'] is not None and d['machine_a'] != d['machine_b']:
+                machine = f"{d['machine_a']} → {d['machine_b']}"
+            self.kpi_table.setItem(rr, 0, QTableWidgetItem(str(d['id'])))
+            self.kpi_table.setItem(rr, 1, QTableWidgetItem(f"{d['start_a']:.2f}" if d['start_a'] is not None else ''))
+            self.kpi_table.setItem(rr, 2, QTableWidgetItem(f"{d['start_b']:.2f}" if d['start_b'] is not None else ''))
+            self.kpi_table.setItem(rr, 3, QTableWidgetItem(f"{d['duration']:g}" if d['duration'] is not None else ''))
+            self.kpi_table.setItem(rr, 4, QTableWidgetItem(f"{d['delta']:.2f}" if d['delta'] is not None else ''))
+            self.kpi_table.setItem(rr, 5, QTableWidgetItem(str(machine)))
+        self.diff_label.setText(f"{len(diff['moved'])} tâche(s) déplacée(s), {len(diff['reassigned'])} changement(s) de machine, "
+                                f"{len(diff['added']) + len(diff['removed'])} absente(s) d'un côté")
 
     def _export_solution(self, sol):
         path, _ = QFileDialog.getSaveFileName(self, 'Enregistrer JSON','solution.json','JSON Files (*.json)')
         if not path:
             return
-        export_json(sol, path)
-        QMessageBox.information(self, 'Export', 'Exporté avec succès')
+        self.parent().enqueue_export('json', {'data': sol}, path)
+
+
+
+class ParetoDialog(QDialog):
+    def __init__(self, parent, points):
+        super().__init__(parent)
+        self.setWindowTitle("Front de Pareto (Cmax / complétion pondérée)")
+        self.resize(1000, 600)
+        self.points = points
+        layout = QVBoxLayout(self)
+
+        self.gantt = GanttCanvas(self)
+        layout.addWidget(self.gantt, 3)
+
+        self.front_table = QTableWidget(0, 3)
+        self.front_table.setHorizontalHeaderLabels(['Cmax', 'Complétion pondérée', 'Retard pondéré'])
+        self.front_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.front_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.front_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.front_table.currentCellChanged.connect(lambda row, *_: self.show_point(row))
+        layout.addWidget(self.front_table, 2)
+
+        footer = QHBoxLayout()
+        use_btn = QPushButton('Utiliser ce planning')
+        use_btn.clicked.connect(self._use_current)
+        export_btn = QPushButton('Export JSON')
+        export_btn.clicked.connect(self._export_current)
+        footer.addWidget(use_btn)
+        footer.addWidget(export_btn)
+        footer.addStretch()
+        layout.addLayout(footer)
+
+        for pt in points:
+            rr = self.front_table.rowCount()
+            self.front_table.insertRow(rr)
+            self.front_table.setItem(rr, 0, QTableWidgetItem(f"{pt['cmax']:.2f}"))
+            self.front_table.setItem(rr, 1, QTableWidgetItem(f"{pt['weighted_completion']:.2f}"))
+            self.front_table.setItem(rr, 2, QTableWidgetItem(f"{pt['lateness']:.2f}"))
+        self.front_table.selectRow(0)
+        self.show_point(0)
+
+    def show_point(self, row):
+        if row < 0 or row >= len(self.points):
+            return
+        pt = self.points[row]
+        self.gantt.plot_gantt(pt['solution'], title=f"Cmax {pt['cmax']:.2f} - WC {pt['weighted_completion']:.2f}")
 
+    def _current(self):
+        row = self.front_table.currentRow()
+        return self.points[row] if 0 <= row < len(self.points) else None
 
+    def _use_current(self):
+        pt = self._current()
+        if pt is None:
+            return
+        self.parent().use_solution(pt['solution'], pt['weighted_completion'])
+        self.accept()
+
+    def _export_current(self):
+        pt = self._current()
+        if pt is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, 'Enregistrer JSON','pareto.json','JSON Files (*.json)')
+        if not path:
+            return
+        self.parent().enqueue_export('json', {'data': pt['solution']}, path)
 
 
 def main():
@@ -0,0 +1,288 @@
+# history.py - versioned schedules with structural sharing
+#
+# Every version is a tuple of fixed-size chunks over a shared task-slot index
+# (id -> slot). A chunk holds read-only arrays (present, machine code, start,
+# end) plus the remaining per-task fields; a new version reuses the chunk
+# objects of its parent wherever nothing changed. Diffing two versions skips
+# chunks they share, so it costs O(changed chunks), and undo/redo only move a
+# cursor.
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64
+_SCHEDULE_KEYS = ('id', 'machine', 'start', 'end')
+
+
+class _Chunk:
+    __slots__ = ('present', 'machine', 'start', 'end', 'extra')
+
+    def __init__(self, present, machine, start, end, extra):
+        for arr in (present, machine, start, end):
+            arr.flags.writeable = False
+        self.present = present
+        self.machine = machine
+        self.start = start
+        self.end = end
+        self.extra = extra
+
+    def same_as(self, other):
+        return (other is not None
+                and np.array_equal(self.present, other.present)
+                and np.array_equal(self.machine, other.machine)
+                and np.array_equal(self.start, other.start, equal_nan=True)
+                and np.array_equal(self.end, other.end, equal_nan=True)
+                and self.extra == other.extra)
+
+
+def _float(val):
+    return np.nan if val is None else float(val)
+
+
+def _value(val):
+    return None if np.isnan(val) else float(val)
+
+
+def _differs(a, b):
+    return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+
+class ScheduleHistory:
+    # history.commit(solution, label) after each solve / load, history.edit(...)
+    # for hand edits, history.diff(a, b) between any two versions.
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._slot = {}
+        self._ids = []
+        self._machine_code = {}
+        self._machines = []
+        self._versions = []
+        self._cursor = None
+        self._redo = []
+
+    # --- versions ---
+
+    def __len__(self):
+        return len(self._versions)
+
+    @property
+    def current(self):
+        return self._cursor
+
+    def versions(self):
+        return [{'version': k, 'label': v['label'], 'obj': v['obj'], 'parent': v['parent']}
+                for k, v in enumerate(self._versions)]
+
+    def info(self, version):
+        v = self._versions[version]
+        return {'version': version, 'label': v['label'], 'obj': v['obj'], 'parent': v['parent']}
+
+    def _code(self, machine):
+        if machine not in self._machine_code:
+            self._machine_code[machine] = len(self._machines)
+            self._machines.append(machine)
+        return self._machine_code[machine]
+
+    def _add(self, chunks, label, obj, parent):
+        self._versions.append({'chunks': tuple(chunks), 'label': label, 'obj': obj, 'parent': parent})
+        self._cursor = len(self._versions) - 1
+        self._redo = []
+        return self._cursor
+
+    def _chunks(self, version):
+        return self._versions[version]['chunks'] if version is not None else ()
+
+    def commit(self, solution, label='', obj=None):
+        # Stores a full solution (list of dicts) as a child of the current
+        # version; chunks identical to the parent's are shared, not copied.
+        for s in solution:
+            if s['id'] not in self._slot:
+                self._slot[s['id']] = len(self._ids)
+                self._ids.append(s['id'])
+        n_slots = len(self._ids)
+        cs = self.chunk_size
+        present = np.zeros(n_slots, dtype=bool)
+        machine = np.full(n_slots, -1, dtype=np.int32)
+        start = np.full(n_slots, np.nan)
+        end = np.full(n_slots, np.nan)
+        extra = [None] * n_slots
+        for s in solution:
+            j = self._slot[s['id']]
+            present[j] = True
+            machine[j] = self._code(s.get('machine'))
+            start[j] = _float(s.get('start'))
+            end[j] = _float(s.get('end'))
+            extra[j] = {k: v for k, v in s.items() if k not in _SCHEDULE_KEYS}
+
+        parent = self._chunks(self._cursor)
+        chunks, shared = [], 0
+        for c in range((n_slots + cs - 1) // cs):
+            sl = slice(c * cs, min((c + 1) * cs, n_slots))
+            old = parent[c] if c < len(parent) else None
+            # keep the parent's per-task dicts where they did not change
+            ext = tuple(e if old is None or k >= len(old.extra) or old.extra[k] != e else old.extra[k]
+                        for k, e in enumerate(extra[sl]))
+            chunk = _Chunk(present[sl].copy(), machine[sl].copy(), start[sl].copy(), end[sl].copy(), ext)
+            if chunk.same_as(old):
+                chunk = old
+                shared += 1
+            chunks.append(chunk)
+        version = self._add(chunks, label, obj, self._cursor)
+        logger.debug("History v%d '%s': %d/%d chunks shared", version, label, shared, len(chunks))
+        return version
+
+    def edit(self, changes, label='modification manuelle', obj=None):
+        # changes: {task_id: {'machine', 'start', 'end'}} applied on the current
+        # version; only the touched chunks are rebuilt. A missing 'end' keeps
+        # the task's duration.
+        if self._cursor is None:
+            raise ValueError("No schedule to edit")
+        chunks = list(self._chunks(self._cursor))
+        cs = self.chunk_size
+        by_chunk = {}
+        for tid, change in changes.items():
+            if tid not in self._slot:
+                raise KeyError(tid)
+            j = self._slot[tid]
+            by_chunk.setdefault(j // cs, []).append((j % cs, change))
+        for c, edits in by_chunk.items():
+            old = chunks[c]
+            machine, start, end = old.machine.copy(), old.start.copy(), old.end.copy()
+            for k, change in edits:
+                if not old.present[k]:
+                    raise KeyError(self._ids[c * cs + k])
+                if 'machine' in change:
+                    machine[k] = self._code(change['machine'])
+                if 'start' in change:
+                    new_start = _float(change['start'])
+                    length = end[k] - start[k]
+                    if np.isnan(length):
+                        length = float(old.extra[k].get('duration', 0.0))
+                    end[k] = _float(change['end']) if 'end' in change else new_start + length
+                    start[k] = new_start
+                elif 'end' in change:
+                    end[k] = _float(change['end'])
+            chunks[c] = _Chunk(old.present, machine, start, end, old.extra)
+        return self._add(chunks, label, obj, self._cursor)
+
+    def get(self, version=None):
+        # materialised solution (list of dicts) for a version, current by default
+        version = self._cursor if version is None else version
+        if version is None:
+            return []
+        solution = []
+        for c, chunk in enumerate(self._chunks(version)):
+            base = c * self.chunk_size
+            for k in np.nonzero(chunk.present)[0]:
+                entry = {'id': self._ids[base + k],
+                         'machine': self._machines[chunk.machine[k]],
+                         'start': _value(chunk.start[k]),
+                         'end': _value(chunk.end[k])}
+                entry.update(chunk.extra[k])
+                solution.append(entry)
+        return solution
+
+    # --- undo / redo ---
+
+    def can_undo(self):
+        return self._cursor is not None and self._versions[self._cursor]['parent'] is not None
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        if not self.can_undo():
+            return None
+        self._redo.append(self._cursor)
+        self._cursor = self._versions[self._cursor]['parent']
+        return self._cursor
+
+    def redo(self):
+        if not self._redo:
+            return None
+        self._cursor = self._redo.pop()
+        return self._cursor
+
+    def checkout(self, version):
+        # jump to any version; the redo stack no longer applies
+        if not 0 <= version < len(self._versions):
+            raise IndexError(version)
+        self._cursor = version
+        self._redo = []
+        return version
+
+    # --- diff ---
+
+    def diff(self, a, b):
+        # Differences from version a to version b. Shared chunks are skipped,
+        # so the cost is proportional to the chunks that actually changed.
+        # Returns {'changes': [{'id', 'machine_a', 'machine_b', 'start_a',
+        # 'start_b', 'delta', 'duration'}], 'moved', 'reassigned', 'added',
+        # 'removed', 'chunks_compared'}.
+        ca, cb = self._chunks(a), self._chunks(b)
+        out = {'changes': [], 'moved': [], 'reassigned': [], 'added': [], 'removed': [], 'chunks_compared': 0}
+        for c in range(max(len(ca), len(cb))):
+            x = ca[c] if c < len(ca) else None
+            y = cb[c] if c < len(cb) else None
+            if x is y:
+                continue
+            out['chunks_compared'] += 1
+            size = max(len(x.present) if x else 0, len(y.present) if y else 0)
+            pa, ma, sa, ea = self._padded(x, size)
+            pb, mb, sb, eb = self._padded(y, size)
+            both = pa & pb
+            moved = both & (_differs(sa, sb) | _differs(ea, eb))
+            reassigned = both & (ma != mb)
+            base = c * self.chunk_size
+            for k in np.nonzero(moved | reassigned | (pa != pb))[0]:
+                tid = self._ids[base + k]
+                if not pa[k]:
+                    out['added'].append(tid)
+                elif not pb[k]:
+                    out['removed'].append(tid)
+                else:
+                    if moved[k]:
+                        out['moved'].append(tid)
+                    if reassigned[k]:
+                        out['reassigned'].append(tid)
+                delta = sb[k] - sa[k]
+                ref_s, ref_e = (sb[k], eb[k]) if pb[k] else (sa[k], ea[k])
+                out['changes'].append({
+                    'id': tid,
+                    'machine_a': self._machines[ma[k]] if pa[k] else None,
+                    'machine_b': self._machines[mb[k]] if pb[k] else None,
+                    'start_a': _value(sa[k]),
+                    'start_b': _value(sb[k]),
+                    'delta': _value(delta),
+                    'duration': _value(ref_e - ref_s),
+                })
+        return out
+
+    @staticmethod
+    def _padded(chunk, size):
+        present = np.zeros(size, dtype=bool)
+        machine = np.full(size, -1, dtype=np.int32)
+        start = np.full(size, np.nan)
+        end = np.full(size, np.nan)
+        if chunk is not None:
+            n = len(chunk.present)
+            present[:n], machine[:n], start[:n], end[:n] = chunk.present, chunk.machine, chunk.start, chunk.end
+        return present, machine, start, end
+
+    def nbytes(self):
+        # memory held by distinct chunks (arrays only)
+        seen = {}
+        for v in self._versions:
+            for chunk in v['chunks']:
+                seen[id(chunk)] = chunk
+        return sum(c.present.nbytes + c.machine.nbytes + c.start.nbytes + c.end.nbytes for c in seen.values())
+
+
+def diff_solutions(left, right, chunk_size=CHUNK_SIZE):
+    # one-off diff of two plain solutions (e.g. two objectives in CompareDialog)
+    history = ScheduleHistory(chunk_size)
+    a = history.commit(left or [])
+    b = history.commit(right or [])
+    return history.diff(a, b)
@@ -0,0 +1,100 @@
+# intervals.py - per-machine index of unavailability windows
+import math
+from bisect import bisect_right
+
+INF = float('inf')
+DAY = 1440.0
+
+
+class AvailabilityIndex:
+    # Sorted, merged unavailability blocks per machine (maintenance, closed
+    # hours, recurring breaks). A machine key of None applies to every machine.
+    # Queries are O(log n + k) with bisect on the block end times.
+
+    def __init__(self):
+        self._raw = {}
+        self._blocks = {}
+        self._ends = {}
+
+    def add(self, machine, start, end, label=''):
+        start, end = float(start), float(end)
+        if end > start:
+            self._raw.setdefault(machine, []).append((start, end, label))
+            self._blocks.pop(machine, None)
+        return self
+
+    def machines(self):
+        return [m for m in self._raw if m is not None]
+
+    def blocks(self, machine):
+        # merged (start, end, labels) for one machine, including global blocks
+        if machine not in self._blocks:
+            raw = sorted(self._raw.get(machine, []) + (self._raw.get(None, []) if machine is not None else []))
+            merged = []
+            for a, b, label in raw:
+                if merged and a <= merged[-1][1]:
+                    pa, pb, labels = merged[-1]
+                    merged[-1] = (pa, max(pb, b), labels + [label])
+                else:
+                    merged.append((a, b, [label]))
+            self._blocks[machine] = [(a, b, tuple(labels)) for a, b, labels in merged]
+            self._ends[machine] = [b for a, b, labels in self._blocks[machine]]
+        return self._blocks[machine]
+
+    def overlapping(self, machine, lo, hi=INF):
+        # blocks with start < hi and end > lo, in time order
+        blocks = self.blocks(machine)
+        out = []
+        for j in range(bisect_right(self._ends[machine], lo), len(blocks)):
+            if blocks[j][0] >= hi:
+                break
+            out.append(blocks[j])
+        return out
+
+    def blocked_time(self, machine, lo, hi):
+        return sum(min(b, hi) - max(a, lo) for a, b, _ in self.overlapping(machine, lo, hi))
+
+    def latest_finish(self, machines, lo, work, slack=0.0):
+        # smallest t with `work` units of free time in [lo, t] on the union of
+        # `machines`, each finite block crossed costing `slack` on top (a task
+        # that does not fit in the gap before it); open-ended blocks are ignored
+        merged = []
+        for a, b in sorted((a, b) for m in machines for a, b, _ in self.overlapping(m, lo) if b != INF):
+            if merged and a <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], b)
+            else:
+                merged.append([a, b])
+        t = lo + work
+        for a, b in merged:
+            if a >= t:
+                break
+            t += b - max(a, lo) + slack
+        return t
+
+
+def build_availability(horizon, maintenances=None, opening_hours=None, breaks=None):
+    # maintenances:  [{'machine', 'start', 'end'}] one-off blocks (end None = until further notice)
+    # opening_hours: {machine or None: (open, close)} in minutes of the day, repeated daily
+    # breaks:        [{'machine' (None = all), 'start', 'end', 'period' (default 1440)}]
+    # Recurring windows are expanded up to `horizon`.
+    index = AvailabilityIndex()
+    for bidx, block in enumerate(maintenances or []):
+        end = block.get('end')
+        index.add(block.get('machine'), float(block.get('start', 0)),
+                  INF if end is None else float(end), f"maintenance {bidx}")
+
+    days = int(math.ceil(horizon / DAY)) + 1
+    for machine, (open_t, close_t) in (opening_hours or {}).items():
+        open_t, close_t = float(open_t), float(close_t)
+        for d in range(days):
+            index.add(machine, d * DAY - (DAY - close_t) if d else 0.0, d * DAY + open_t, f"closed {machine or '*'}")
+        index.add(machine, (days - 1) * DAY + close_t, days * DAY, f"closed {machine or '*'}")
+
+    for brk in breaks or []:
+        period = float(brk.get('period', DAY))
+        a, b = float(brk['start']), float(brk['end'])
+        k = 0
+        while a + k * period < horizon:
+            index.add(brk.get('machine'), a + k * period, b + k * period, f"break {brk.get('machine') or '*'}")
+            k += 1
+    return index
@@ -0,0 +1,245 @@
+# lns.py - Large Neighborhood Search over solver incumbents
+import logging
+import multiprocessing
+import random
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from gurobipy import GRB
+
+from .model import (build_model, set_objective, set_warm_start, extract_solution,
+                    evaluate_objective, solve_multi_machine)
+
+logger = logging.getLogger(__name__)
+
+# solve_multi_machine options that the neighborhood sub-MIPs do not take
+_SOLVE_ONLY = ('screen',)
+
+
+def _neighborhoods(tasks, solution, size, rng):
+    # one candidate per kind: machine, time window, staff group, worst lateness
+    by_id = {t['id']: t for t in tasks}
+    placed = sorted((s for s in solution if s.get('start') is not None), key=lambda s: s['start'])
+    if not placed:
+        return []
+    hoods = []
+
+    machines = sorted({s['machine'] for s in placed if s['machine'] is not None})
+    if machines:
+        m = rng.choice(machines)
+        on_m = [s['id'] for s in placed if s['machine'] == m]
+        a = rng.randrange(max(1, len(on_m) - size + 1))
+        hoods.append((f"machine:{m}", set(on_m[a:a + size])))
+
+    a = rng.randrange(max(1, len(placed) - size + 1))
+    window = placed[a:a + size]
+    hoods.append((f"window:{window[0]['start']:.0f}-{window[-1]['end']:.0f}", {s['id'] for s in window}))
+
+    groups = sorted({s.get('staff_group') for s in placed if s.get('staff_group')})
+    if groups:
+        g = rng.choice(groups)
+        in_g = [s['id'] for s in placed if s.get('staff_group') == g]
+        a = rng.randrange(max(1, len(in_g) - size + 1))
+        hoods.append((f"staff:{g}", set(in_g[a:a + size])))
+
+    def late(s):
+        d = by_id.get(s['id'], {}).get('deadline')
+        if d in [None, '']:
+            return 0.0
+        return s['priority'] * max(0.0, s['end'] - float(d))
+    worst = sorted(placed, key=lambda s: (late(s), s['priority'] * s['end']), reverse=True)
+    hoods.append(("lateness", {s['id'] for s in worst[:size]}))
+    return hoods
+
+
+def solve_neighborhood(tasks, solution, free_ids, objective="weighted_completion",
+                       time_limit=5, penalty_lateness=0.0, allow_reassign=False,
+                       maintenances=None, staff_capacity=None, time_granularity=5,
+                       opening_hours=None, breaks=None, params=None, tuned=True):
+    # Sub-MIP over the free tasks only, as in repair_schedule: each may move
+    # within its incumbent slot padded by the longest free task, and the other
+    # tasks it can collide with there (same machine, staff group, setup_after
+    # links) are fixed context. Returns the full solution with the free tasks
+    # updated, or None.
+    started = time.monotonic()
+    inc = {s['id']: s for s in solution if s.get('start') is not None}
+    by_id = {t['id']: t for t in tasks}
+    free = [tid for tid in inc if tid in free_ids and tid in by_id]
+    if not free:
+        return None
+    free_set = set(free)
+    pad = max(inc[tid]['duration'] for tid in free)
+    window = {tid: (max(0.0, inc[tid]['start'] - pad), inc[tid]['end'] + pad) for tid in free}
+    spans = []
+    for a, b in sorted(window.values()):
+        if spans and a <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], b)
+        else:
+            spans.append([a, b])
+    span_ends = [b for a, b in spans]
+
+    machines = {inc[tid]['machine'] for tid in free}
+    groups = {by_id[tid].get('staff_group') for tid in free} if staff_capacity else set()
+    linked = set()
+    for tid in inc:
+        for other, st in (by_id.get(tid, {}).get('setup_after') or {}).items():
+            if float(st) > 0 and other in inc and (tid in free_set) != (other in free_set):
+                linked.add(other if tid in free_set else tid)
+    context = []
+    for tid, s_k in inc.items():
+        if tid in free_set:
+            continue
+        j = bisect_right(span_ends, s_k['start'])
+        overlaps = j < len(spans) and spans[j][0] < s_k['end']
+        related = allow_reassign or s_k['machine'] in machines or (groups and s_k.get('staff_group') in groups)
+        if (overlaps and related) or tid in linked:
+            context.append(tid)
+
+    sub_tasks = []
+    for tid in free:
+        t = dict(by_id[tid])
+        t['machine'] = inc[tid]['machine']
+        t['release'] = max(float(t.get('release', 0.0)), window[tid][0])
+        sub_tasks.append(t)
+    for tid in context:
+        t = dict(by_id[tid])
+        t['machine'] = inc[tid]['machine']
+        t['duration'] = inc[tid]['duration']
+        t['release'] = inc[tid]['start']
+        sub_tasks.append(t)
+
+    logger.debug("Neighborhood: %d free, %d context tasks", len(free), len(context))
+    data = build_model(sub_tasks,
+                       time_limit=time_limit,
+                       allow_reassign=allow_reassign,
+                       maintenances=maintenances,
+                       staff_capacity=staff_capacity,
+                       time_granularity=time_granularity,
+                       opening_hours=opening_hours,
+                       breaks=breaks,
+                       fixed={i: inc[sub_tasks[i]['id']]['start'] for i in range(len(free), len(sub_tasks))},
+                       params=params,
+                       tuned=tuned)
+    set_objective(data, objective, penalty_lateness)
+    model = data.model
+    model.Params.Threads = 1
+    n_free = len(free)
+    for i in range(n_free):
+        model.addConstr(data.S[i] + data.p[i] <= window[sub_tasks[i]['id']][1], name=f"window_{i}")
+    set_warm_start(data, [inc[t['id']] for t in sub_tasks])
+    # the build counts against the neighborhood's budget
+    model.Params.TimeLimit = max(0.1, time_limit - (time.monotonic() - started))
+
+    model.optimize()
+    sub_sol, _ = extract_solution(data)
+    if not sub_sol:
+        return None
+    moved = {e['id']: e for e in sub_sol[:n_free]}
+    result = []
+    for s in solution:
+        entry = dict(s)
+        if s['id'] in moved:
+            entry.update({k: moved[s['id']][k] for k in ('machine', 'start', 'end')})
+        result.append(entry)
+    return result
+
+
+def _run_neighborhood(args):
+    name, tasks, solution, free_ids, objective, time_limit, kwargs = args
+    try:
+        sol = solve_neighborhood(tasks, solution, free_ids, objective, time_limit, **kwargs)
+    except Exception as e:  # a failing worker must not stop the search
+        return name, None, str(e)
+    return name, sol, None
+
+
+def _better(val, ref, rel=1e-6):
+    # strict improvement beyond float noise; lexicographic for tuples
+    if isinstance(val, tuple):
+        for v, r in zip(val, ref):
+            tol = rel * max(1.0, abs(r))
+            if v < r - tol:
+                return True
+            if v > r + tol:
+                return False
+        return False
+    return val < ref - rel * max(1.0, abs(ref))
+
+
+def improve_lns(tasks,
+                solution,
+                objective="weighted_completion",
+                time_limit=60,
+                max_rounds=None,
+                workers=4,
+                neighborhood_size=15,
+                sub_time_limit=5,
+                seed=0,
+                **kwargs):
+    # Runs one batch of neighborhoods per round in parallel worker processes
+    # and keeps the best improving schedule. kwargs are the solve_multi_machine
+    # model options (penalty_lateness, allow_reassign, maintenances, ...).
+    # Returns (solution, objective value, history of accepted moves).
+    rng = random.Random(seed)
+    kwargs = {k: v for k, v in kwargs.items() if k not in _SOLVE_ONLY}
+    penalty = kwargs.get('penalty_lateness', 0.0)
+    best = [dict(s) for s in solution]
+    best_val = evaluate_objective(best, tasks, objective, penalty)
+    history = []
+    size = min(neighborhood_size, len(tasks))
+    deadline = time.monotonic() + time_limit
+    rounds = 0
+
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        while time.monotonic() < deadline and (max_rounds is None or rounds < max_rounds):
+            rounds += 1
+            sub_limit = max(0.5, min(sub_time_limit, deadline - time.monotonic()))
+            hoods = []
+            while len(hoods) < workers:
+                batch = _neighborhoods(tasks, best, size, rng)
+                if not batch:
+                    break
+                hoods += batch
+            if not hoods:
+                break
+            jobs = [(name, tasks, best, ids, objective, sub_limit, kwargs) for name, ids in hoods[:workers]]
+
+            improved = None
+            for name, sol, err in pool.map(_run_neighborhood, jobs):
+                if err:
+                    logger.warning("LNS neighborhood %s failed: %s", name, err)
+                    continue
+                if not sol:
+                    continue
+                val = evaluate_objective(sol, tasks, objective, penalty)
+                if _better(val, best_val) and (improved is None or _better(val, improved[1])):
+                    improved = (sol, val, name)
+
+            if improved:
+                best, best_val, name = improved
+                history.append({'round': rounds, 'neighborhood': name, 'obj': best_val})
+                logger.info("LNS round %d: %s improved obj to %s", rounds, name, best_val)
+            elif size < len(tasks):
+                # stuck: widen the neighborhoods
+                size = min(len(tasks), int(size * 1.5) + 1)
+
+    return best, best_val, history
+
+
+def solve_with_lns(tasks,
+                   time_limit=30,
+                   lns_time_limit=60,
+                   objective="weighted_completion",
+                   workers=4,
+                   mip_gap=1e-4,
+                   **kwargs):
+    # solve_multi_machine, then LNS when the solver stopped on TimeLimit with a gap
+    solution, obj_val, model = solve_multi_machine(tasks, time_limit=time_limit,
+                                                   objective=objective, **kwargs)
+    if not solution or model is None or model.Status != GRB.TIME_LIMIT or model.MIPGap <= mip_gap:
+        return solution, obj_val, []
+    logger.info("TimeLimit with gap %.2f%%, starting LNS", 100 * model.MIPGap)
+    return improve_lns(tasks, solution, objective=objective, time_limit=lns_time_limit,
+                       workers=workers, **kwargs)
@@ -1,22 +1,42 @@
 # model.py (replacement for solve_multi_machine)
 import logging
+from types import SimpleNamespace
 from gurobipy import Model, GRB, quicksum
 
+from .intervals import build_availability
+from .screening import screen_instance, InfeasibleInstance, format_diagnosis
+from .validator import validate_schedule, log_violations
+from .tuning import solver_params
+
 logger = logging.getLogger(__name__)
 
-def solve_multi_machine(tasks,
-                        time_limit=30,
-                        objective="weighted_completion",
-                        allow_reassign=False,
-                        penalty_lateness=0.0,
-                        maintenances=None,
-                        staff_capacity=None,
-                        time_granularity=5):
 
+def build_model(tasks,
+                time_limit=30,
+                allow_reassign=False,
+                maintenances=None,
+                staff_capacity=None,
+                time_granularity=5,
+                opening_hours=None,
+                breaks=None,
+                fixed=None,
+                params=None,
+                tuned=True,
+                latest_cuts=True,
+                min_horizon=0.0):
+    # Builds the scheduling MIP without an objective so that callers
+    # (single solve, Pareto sweep, ...) can reuse the same model.
+    # params: extra Gurobi parameters; with tuned=True the parameter set found
+    # by scheduler.tuning for this instance class is applied first.
+    # fixed: {task index: start} for context tasks that stay where they are on
+    # their 'machine' (repair, LNS); no constraints are built between two of them.
+    # latest_cuts=False drops the latest-finish bounds below, which only hold
+    # for objectives that prefer earlier finishes (not for repair's deviation
+    # from old starts); the horizon then covers min_horizon (e.g. the old
+    # finish times) plus all the work.
+    # Staff capacity is modelled exactly at task starts, so time_granularity
+    # is only kept for existing callers.
     n = len(tasks)
-    if n == 0:
-        return [], None, None
-
     J = range(n)
     # collect machines set
     machines = sorted(list({t.get('machine') for t in tasks if t.get('machine') is not None}))
@@ -51,7 +71,46 @@ def solve_multi_machine(tasks,
                 except Exception:
                     s_setup[i][k] = 0.0
 
-    horizon = sum(p.values()) + max(0, max(r.values()) if r else 0) + 100
+    r_max = max(0.0, max(r.values()) if r else 0.0)
+    lo = r_max if latest_cuts else max(r_max, float(min_horizon or 0.0))
+    horizon = sum(p.values()) + lo + 100
+
+    # machine availability (maintenance, opening hours, breaks) as an interval index.
+    # Some optimal (active) schedule finishes every task by the latest release
+    # plus all work and setups plus the blocked time actually crossed, so that
+    # bound replaces the horizon and blocks past it are never looked at.
+    has_blocks = bool(maintenances or opening_hours or breaks)
+    avail = None
+    latest = {}
+    if has_blocks:
+        work = sum(p.values()) + sum(max(s_setup[i].values()) for i in J)
+        slack = max(p.values()) if p else 0.0
+        # setup_after across machines chains the waits of several machines,
+        # and so does a binding staff group whose tasks span several machines
+        cross = any(s_setup[i][k] > 0 and (allow_reassign or tasks[i].get('machine') != tasks[k].get('machine'))
+                    for i in J for k in J)
+        for grp, cap in (staff_capacity or {}).items():
+            members = [i for i in J if staff[i] == grp]
+            spanned = set()
+            for i in members:
+                spanned.add(tasks[i].get('machine'))
+                if allow_reassign:
+                    spanned.update(tasks[i].get('eligible_machines') or machines)
+            if int(cap) < len(members) and len(spanned - {None}) > 1:
+                cross = True
+        union = cross or not latest_cuts
+        expand_to = 2 * horizon
+        while True:
+            avail = build_availability(expand_to, maintenances, opening_hours, breaks)
+            for m in machines:
+                latest[m] = avail.latest_finish(machines if union else [m], lo, work, slack)
+            if max(latest.values() or [0.0]) < expand_to:
+                break
+            expand_to *= 2
+        horizon = max([horizon] + list(latest.values()))
+        if not latest_cuts:
+            # a single bound for every machine: the model's time domain
+            latest = {m: horizon for m in machines}
 
     bigM = horizon + max(max(s_setup[i].values()) for i in J)
 
@@ -59,20 +118,38 @@ def solve_multi_machine(tasks,
     model = Model("Scheduler_Advanced")
     model.Params.TimeLimit = time_limit
     model.Params.OutputFlag = 0
+    applied = solver_params(model, tasks, allow_reassign, maintenances, staff_capacity,
+                            opening_hours, breaks, params, tuned)
+    if applied:
+        logger.info("Gurobi parameters: %s", applied)
 
+    fixed = fixed or {}
     # Start times
     S = model.addVars(J, lb=0.0, vtype=GRB.CONTINUOUS, name='Start')
+    for i, st in fixed.items():
+        S[i].LB = S[i].UB = st
     # Assigned machine index if reassign allowed
     if allow_reassign:
         y = model.addVars(J, len(machines), vtype=GRB.BINARY, name='Assign')
+        ineligible = set()
         # each job assigned to exactly one machine
         for i in J:
-            model.addConstr(quicksum(y[i,m] for m in Mset) == 1)
+            model.addConstr(quicksum(y[i,m] for m in Mset) == 1, name=f"assign_{i}")
+            # restrict to eligible machines when the task lists them
+            em = tasks[i].get('eligible_machines')
+            if i in fixed:
+                em = [tasks[i].get('machine')]
+            if em and isinstance(em, (list,tuple)):
+                for m in Mset:
+                    if machines[m] not in em:
+                        y[i,m].UB = 0
+                        ineligible.add((i, m))
     else:
         y = None
 
-    # sequencing binaries x[i,k] for i != k (if they share assigned machine)
-    x = model.addVars(J, J, vtype=GRB.BINARY, name='Order')
+    # sequencing binaries x[i,k] (i < k, 1 = i first), only for pairs that can
+    # share a machine
+    x = {}
 
     # Makespan
     Cmax = model.addVar(vtype=GRB.CONTINUOUS, name='Cmax')
@@ -82,95 +159,184 @@ def solve_multi_machine(tasks,
 
     for i in J:
         for k in J:
-            if i == k: 
+            if i == k or (i in fixed and k in fixed):
                 continue
 
-            if allow_reassign:
-                # If both assigned to same machine m, then enforce ordering constraints for any m
-                for m in Mset:
-                    model.addConstr(S[i] + p[i] + s_setup[i][k] <= S[k] + bigM*(1 - x[i,k]) + bigM*(1 - (y[i,m] + y[k,m])/2))
-                    model.addConstr(S[k] + p[k] + s_setup[k][i] <= S[i] + bigM*(x[i,k]) + bigM*(1 - (y[i,m] + y[k,m])/2))
-            else:
-                mi = tasks[i].get('machine')
-                mk = tasks[k].get('machine')
-                if mi is not None and mk is not None and mi == mk:
-                    model.addConstr(S[i] + p[i] + s_setup[i][k] <= S[k] + bigM*(1 - x[i,k]))
-                    model.addConstr(S[k] + p[k] + s_setup[k][i] <= S[i] + bigM*(x[i,k]))
+            if i < k:
+                if allow_reassign:
+                    # If both assigned to same machine m, then enforce ordering constraints for that m
+                    shared = [m for m in Mset if (i, m) not in ineligible and (k, m) not in ineligible]
+                    if shared:
+                        x[i,k] = model.addVar(vtype=GRB.BINARY, name=f"Order[{i},{k}]")
+                    for m in shared:
+                        model.addConstr(S[i] + p[i] + s_setup[i][k] <= S[k] + bigM*(1 - x[i,k]) + bigM*(1 - (y[i,m] + y[k,m])/2), name=f"seq_{i}_{k}_{m}")
+                        model.addConstr(S[k] + p[k] + s_setup[k][i] <= S[i] + bigM*(x[i,k]) + bigM*(1 - (y[i,m] + y[k,m])/2), name=f"seq_{k}_{i}_{m}")
+                else:
+                    mi = tasks[i].get('machine')
+                    mk = tasks[k].get('machine')
+                    if mi is not None and mk is not None and mi == mk:
+                        x[i,k] = model.addVar(vtype=GRB.BINARY, name=f"Order[{i},{k}]")
+                        model.addConstr(S[i] + p[i] + s_setup[i][k] <= S[k] + bigM*(1 - x[i,k]), name=f"seq_{i}_{k}")
+                        model.addConstr(S[k] + p[k] + s_setup[k][i] <= S[i] + bigM*(x[i,k]), name=f"seq_{k}_{i}")
 
             if s_setup[i][k] > 0:
-                model.addConstr(S[i] >= S[k] + p[k] + s_setup[i][k])
+                model.addConstr(S[i] >= S[k] + p[k] + s_setup[i][k], name=f"setup_{i}_{k}")
 
     # --- release and deadlines  ---
+    deadlines = {}
     for i in J:
-        model.addConstr(S[i] >= r[i])
+        model.addConstr(S[i] >= r[i], name=f"release_{i}")
         d_val = tasks[i].get('deadline', None)
         if d_val not in [None, '']:
             try:
                 dval = float(d_val)
-                model.addConstr(S[i] + p[i] - dval <= L[i])
+                model.addConstr(S[i] + p[i] - dval <= L[i], name=f"deadline_{i}")
+                deadlines[i] = dval
             except Exception:
                 pass
         else:
-           
+
             pass
 
-    if maintenances:
-        for block in maintenances:
-            mm = block.get('machine')
-            a = float(block.get('start', 0))
-            b = float(block.get('end', 0))
-            # for tasks on same machine, either finish before a or start after b
-            for i in J:
-                task_m = tasks[i].get('machine')
+    # Only blocks between the release and the latest finish on the machine are
+    # looked at. A block the task cannot finish before gives a plain lower
+    # bound, one it cannot get past in time a plain upper bound, the others a
+    # disjunction.
+    maint_blocks = []
+    block_ids = {}
+    if avail is not None:
+        for i in J:
+            if i in fixed:
+                continue
+            if allow_reassign:
+                cands = [m for m in Mset if (i, m) not in ineligible]
+            elif tasks[i].get('machine') in machine_idx:
+                cands = [machine_idx[tasks[i].get('machine')]]
+            else:
+                cands = []
+            for m_idx in cands:
+                lf = latest[machines[m_idx]]
                 if allow_reassign:
-                    if mm in machine_idx:
-                        m_idx = machine_idx[mm]
-                        model.addConstr(S[i] + p[i] <= a + bigM*(1 - y[i,m_idx]) )
-                        model.addConstr(S[i] >= b - bigM*(1 - y[i,m_idx]) )
+                    off = bigM * (1 - y[i,m_idx])
+                    if lf < horizon:
+                        model.addConstr(S[i] + p[i] <= lf + (horizon - lf) * (1 - y[i,m_idx]), name=f"latest_{i}_{m_idx}")
                 else:
-                    if task_m == mm:
-                        # must be before a or after b; encode as: S[i] + p[i] <= a OR S[i] >= b
-                        # emulate with x-like binary z_maint[i,block] but easier: create a binary z and two constraints
-                        z = model.addVar(vtype=GRB.BINARY, name=f"z_maint_{i}_{a}_{b}")
-                        model.addConstr(S[i] + p[i] <= a + bigM * z)
-                        model.addConstr(S[i] >= b - bigM * (1 - z))
-
-    staff_time_vars = None
+                    off = 0
+                    model.addConstr(S[i] + p[i] <= lf, name=f"latest_{i}_{m_idx}")
+                e = r[i]
+                prev_z = None
+                for a, b, labels in avail.overlapping(machines[m_idx], r[i], lf):
+                    key = (m_idx, a, b)
+                    if key not in block_ids:
+                        block_ids[key] = len(maint_blocks)
+                        maint_blocks.append((machines[m_idx], a, b, labels))
+                    bidx = block_ids[key]
+                    before_only = b + p[i] > lf
+                    if e + p[i] > a:
+                        # cannot finish before the block
+                        if before_only:
+                            if allow_reassign:
+                                y[i,m_idx].UB = 0
+                                ineligible.add((i, m_idx))
+                            else:
+                                model.addConstr(S[i] + p[i] <= a, name=f"maint_{i}_{bidx}_before")
+                            break
+                        model.addConstr(S[i] >= b - off, name=f"maint_{i}_{bidx}_after")
+                        e = b
+                        continue
+                    if before_only:
+                        model.addConstr(S[i] + p[i] <= a + off, name=f"maint_{i}_{bidx}_before")
+                        break
+                    # before a or after b; z = 1 means after
+                    z = model.addVar(vtype=GRB.BINARY, name=f"z_maint_{i}_{m_idx}_{bidx}")
+                    model.addConstr(S[i] + p[i] <= a + bigM * z + off, name=f"maint_{i}_{bidx}_before")
+                    model.addConstr(S[i] >= b - bigM * (1 - z) - off, name=f"maint_{i}_{bidx}_after")
+                    if prev_z is not None:
+                        # after this block implies after the previous one
+                        model.addConstr(z <= prev_z, name=f"maintorder_{i}_{bidx}")
+                    prev_z = z
+
+    # staff capacity, checked at task starts (the load only peaks there):
+    # cap 1 is a plain disjunction per pair, otherwise the tasks of the group
+    # still running when i starts must leave room for i
+    staff_vars = {}
     if staff_capacity:
+        eps = 1e-3
+        for gidx, (grp, cap) in enumerate(staff_capacity.items()):
+            members = [i for i in J if staff[i] == grp]
+            if int(cap) >= len(members):
+                continue
+            if int(cap) == 1:
+                for a_, i in enumerate(members):
+                    for k in members[a_ + 1:]:
+                        if i in fixed and k in fixed:
+                            continue
+                        q = model.addVar(vtype=GRB.BINARY, name=f"staff_order_{i}_{k}")
+                        model.addConstr(S[i] + p[i] <= S[k] + bigM * (1 - q), name=f"staffseq_{i}_{k}")
+                        model.addConstr(S[k] + p[k] <= S[i] + bigM * q, name=f"staffseq_{k}_{i}")
+                        staff_vars[i, k] = q
+                continue
+            for i in members:
+                running = []
+                busy = 0
+                for k in members:
+                    if k == i:
+                        continue
+                    if i in fixed and k in fixed:
+                        busy += fixed[k] <= fixed[i] < fixed[k] + p[k]
+                        continue
+                    # started[k,i] = 0 -> k starts after i; alive[k,i] = 0 -> k ended by S_i
+                    started = model.addVar(vtype=GRB.BINARY, name=f"staff_started_{k}_{i}")
+                    alive = model.addVar(vtype=GRB.BINARY, name=f"staff_alive_{k}_{i}")
+                    run = model.addVar(vtype=GRB.BINARY, name=f"staff_running_{k}_{i}")
+                    model.addConstr(S[k] >= S[i] + eps - bigM * started, name=f"staffbef_{k}_{i}")
+                    model.addConstr(S[k] + p[k] <= S[i] + bigM * alive, name=f"staffaft_{k}_{i}")
+                    model.addConstr(run >= started + alive - 1, name=f"staffrun_{k}_{i}")
+                    staff_vars[k, i] = run
+                    running.append(run)
+                model.addConstr(quicksum(running) <= int(cap) - 1 - busy, name=f"staffcap_{gidx}_{i}")
 
-        gran = max(1, int(time_granularity))
-        T = list(range(0, int(horizon) + gran, gran))
+    for i in J:
+        model.addConstr(Cmax >= S[i] + p[i], name=f"cmax_{i}")
 
-        staff_time_vars = model.addVars(J, len(T), vtype=GRB.BINARY, name='run_slot')
+    return SimpleNamespace(model=model, tasks=tasks, J=J, machines=machines, Mset=Mset,
+                           machine_idx=machine_idx, p=p, r=r, w=w, staff=staff,
+                           s_setup=s_setup, deadlines=deadlines, horizon=horizon, bigM=bigM,
+                           allow_reassign=allow_reassign, S=S, y=y, x=x, Cmax=Cmax, L=L,
+                           staff_vars=staff_vars, maint_blocks=maint_blocks,
+                           staff_groups=list((staff_capacity or {}).keys()))
 
-        eps = 1e-6
-        for i in J:
-            for tidx, tstart in enumerate(T):
-                model.addConstr(S[i] <= tstart + bigM*(1 - staff_time_vars[i,tidx]) )
-                model.addConstr(S[i] + p[i] >= tstart + eps - bigM*(1 - staff_time_vars[i,tidx]) )
-        # capacity per staff group
-        for grp, cap in staff_capacity.items():
 
-            for tidx, tstart in enumerate(T):
-                model.addConstr(quicksum(staff_time_vars[i,tidx] for i in J if staff[i] == grp) <= int(cap))
+def weighted_completion_expr(data):
+    return quicksum(data.w[i] * (data.S[i] + data.p[i]) for i in data.J)
 
 
-    for i in J:
-        model.addConstr(Cmax >= S[i] + p[i])
+def weighted_lateness_expr(data):
+    return quicksum(data.w[i] * data.L[i] for i in data.J)
+
 
+def set_objective(data, objective="weighted_completion", penalty_lateness=0.0):
+    model, Cmax = data.model, data.Cmax
+    wc = weighted_completion_expr(data)
 
     #  objectives
     if objective == "makespan":
         base_obj = Cmax
     elif objective == "weighted_completion":
-        base_obj = quicksum(w[i] * (S[i] + p[i]) for i in J)
+        base_obj = wc
     elif objective == "multi_criteria":  # fallback to weighted sum with defaults
         alpha = 1.0
         beta = 0.5
-        base_obj = alpha * Cmax + beta * quicksum(w[i] * (S[i] + p[i]) for i in J)
+        base_obj = alpha * Cmax + beta * wc
     elif objective.startswith("lex_makespan"):
-
-        base_obj = Cmax
+        # hierarchical: makespan first, then weighted completion among makespan-optimal plans
+        secondary = wc
+        if penalty_lateness and penalty_lateness > 0:
+            secondary = wc + penalty_lateness * weighted_lateness_expr(data)
+        model.ModelSense = GRB.MINIMIZE
+        model.setObjectiveN(Cmax, index=0, priority=2, name='Cmax')
+        model.setObjectiveN(secondary, index=1, priority=1, name='WeightedCompletion')
+        return
     elif objective.startswith("weighted_sum"):
 
         parts = objective.split(':')
@@ -178,45 +344,225 @@ def solve_multi_machine(tasks,
             alpha = float(parts[1]); beta = float(parts[2])
         else:
             alpha = 1.0; beta = 0.5
-        base_obj = alpha * Cmax + beta * quicksum(w[i] * (S[i] + p[i]) for i in J)
+        base_obj = alpha * Cmax + beta * wc
     else:
-        base_obj = quicksum(w[i] * (S[i] + p[i]) for i in J)
+        base_obj = wc
 
 
     if penalty_lateness and penalty_lateness > 0:
-        obj = base_obj + penalty_lateness * quicksum(w[i] * L[i] for i in J)
+        obj = base_obj + penalty_lateness * weighted_lateness_expr(data)
     else:
         obj = base_obj
 
     model.setObjective(obj, GRB.MINIMIZE)
 
 
+def schedule_kpis(solution, tasks):
+    # Cmax / weighted completion / weighted lateness measured on the schedule itself
+    deadlines = {}
+    for t in tasks:
+        d = t.get('deadline')
+        if d not in [None, '']:
+            try:
+                deadlines[t['id']] = float(d)
+            except (TypeError, ValueError):
+                pass
+    cmax = 0.0
+    wc = 0.0
+    late = 0.0
+    for s in solution:
+        if s['end'] is None:
+            continue
+        cmax = max(cmax, s['end'])
+        wc += s['priority'] * s['end']
+        if s['id'] in deadlines:
+            late += s['priority'] * max(0.0, s['end'] - deadlines[s['id']])
+    return {'cmax': cmax, 'weighted_completion': wc, 'lateness': late}
+
+
+def evaluate_objective(solution, tasks, objective="weighted_completion", penalty_lateness=0.0):
+    # same objectives as set_objective, computed on a finished schedule;
+    # lex_makespan gives a (Cmax, secondary) tuple so comparisons stay lexicographic
+    k = schedule_kpis(solution, tasks)
+    late = penalty_lateness * k['lateness'] if penalty_lateness and penalty_lateness > 0 else 0.0
+    if objective == "makespan":
+        return k['cmax'] + late
+    if objective == "multi_criteria":
+        return 1.0 * k['cmax'] + 0.5 * k['weighted_completion'] + late
+    if objective.startswith("lex_makespan"):
+        return (k['cmax'], k['weighted_completion'] + late)
+    if objective.startswith("weighted_sum"):
+        parts = objective.split(':')
+        if len(parts) == 3:
+            alpha = float(parts[1]); beta = float(parts[2])
+        else:
+            alpha = 1.0; beta = 0.5
+        return alpha * k['cmax'] + beta * k['weighted_completion'] + late
+    return k['weighted_completion'] + late
+
+
+def set_warm_start(data, solution):
+    # MIP start from a previous solution dict list (ids not in the model are ignored)
+    by_id = {s['id']: s for s in (solution or []) if s.get('start') is not None}
+    starts = {}
+    for i in data.J:
+        s = by_id.get(data.tasks[i]['id'])
+        if s is None:
+            continue
+        starts[i] = (float(s['start']), s.get('machine'))
+        data.S[i].Start = starts[i][0]
+        if data.y is not None and s.get('machine') in data.machine_idx:
+            for m in data.Mset:
+                data.y[i,m].Start = 1.0 if data.machines[m] == s['machine'] else 0.0
+    for (i, k), var in data.x.items():
+        if i in starts and k in starts and starts[i][1] == starts[k][1]:
+            var.Start = 1.0 if starts[i][0] <= starts[k][0] else 0.0
+    if len(starts) == len(data.J) and starts:
+        data.Cmax.Start = max(starts[i][0] + data.p[i] for i in starts)
+
+
+def extract_solution(data):
+    model = data.model
+    solution = []
+    if model.Status not in [GRB.OPTIMAL, GRB.TIME_LIMIT] or model.SolCount == 0:
+        return solution, None
+    for i in data.J:
+        s_val = float(data.S[i].X) if data.S[i].X is not None else None
+        assigned_machine = data.tasks[i].get('machine')
+        if data.allow_reassign and data.y:
+            for m in data.Mset:
+                if data.y[i,m].X > 0.5:
+                    assigned_machine = data.machines[m]
+                    break
+        solution.append({
+            "id": data.tasks[i]['id'],
+            "machine": assigned_machine,
+            "start": s_val,
+            "end": (s_val + data.p[i]) if s_val is not None else None,
+            "duration": data.p[i],
+            "priority": data.w[i],
+            "staff_group": data.staff[i],
+        })
+    return solution, model.ObjVal
+
+
+def diagnose_infeasibility(data):
+    # IIS mapped back to task ids and constraint families (seq, setup, release,
+    # maint, staffcap, ...), using the constraint names set in build_model
+    model = data.model
+    model.computeIIS()
+    families = {}
+    task_ids = set()
+    details = []
+    for c in model.getConstrs():
+        if not c.IISConstr:
+            continue
+        parts = c.ConstrName.split('_')
+        family = parts[0]
+        ids = []
+        note = ''
+        if family == 'staffcap':
+            gidx, i = int(parts[1]), int(parts[2])
+            note = f"{data.staff_groups[gidx]} au début de {data.tasks[i]['id']}"
+            ids = [data.tasks[i]['id']]
+        else:
+            nums = [int(v) for v in parts[1:] if v.isdigit()]
+            if family in ('maint', 'maintorder'):
+                machine, a, b, labels = data.maint_blocks[nums[1]]
+                note = f"{machine} [{a:g}, {b:g}] ({', '.join(labels)})"
+                nums = nums[:1]
+            elif family == 'latest' and len(nums) == 2:
+                # latest_{i}_{machine index}
+                note = f"{data.machines[nums[1]]} <= {c.RHS:g}" if not data.allow_reassign else data.machines[nums[1]]
+                nums = nums[:1]
+            elif family in ('window', 'outage'):
+                nums = nums[:1]
+            elif family == 'seq' and len(nums) == 3:
+                nums = nums[:2]
+            ids = [data.tasks[v]['id'] for v in nums if v in data.J]
+        families[family] = families.get(family, 0) + 1
+        task_ids.update(ids)
+        details.append({'constraint': c.ConstrName, 'family': family, 'task_ids': ids, 'note': note})
+    for v in model.getVars():
+        if v.IISLB or v.IISUB:
+            # Start[i], Assign[i,m], Order[i,k], z_maint_i_m_bidx, staff_order_i_k, ...
+            name = v.VarName
+            if '[' in name:
+                base, idx = name[:-1].split('[', 1)
+                nums = [int(x) for x in idx.split(',') if x.strip().isdigit()]
+                nums = nums if base == 'Order' else nums[:1]
+            else:
+                nums = [int(x) for x in name.split('_') if x.isdigit()]
+                nums = nums[:1] if name.startswith('z_') else nums
+            ids = [data.tasks[k]['id'] for k in nums if k in data.J]
+            families['bound'] = families.get('bound', 0) + 1
+            task_ids.update(ids)
+            details.append({'constraint': name, 'family': 'bound', 'task_ids': ids,
+                            'note': f"{name} >= {v.LB:g}" if v.IISLB else f"{name} <= {v.UB:g}"})
+    return {'families': families, 'task_ids': sorted(task_ids, key=str), 'constraints': details}
+
+
+def solve_multi_machine(tasks,
+                        time_limit=30,
+                        objective="weighted_completion",
+                        allow_reassign=False,
+                        penalty_lateness=0.0,
+                        maintenances=None,
+                        staff_capacity=None,
+                        time_granularity=5,
+                        screen=True,
+                        opening_hours=None,
+                        breaks=None,
+                        params=None,
+                        tuned=True):
+    # params / tuned: Gurobi parameters, see build_model.
+
+    n = len(tasks)
+    if n == 0:
+        return [], None, None
+
+    if screen:
+        # cheap checks first so hopeless inputs never reach the solver
+        issues = screen_instance(tasks,
+                                 allow_reassign=allow_reassign,
+                                 maintenances=maintenances,
+                                 staff_capacity=staff_capacity)
+        errors = [iss for iss in issues if iss['severity'] == 'error']
+        for iss in issues:
+            if iss['severity'] != 'error':
+                logger.warning("Screening: %s", iss['message'])
+        if errors:
+            raise InfeasibleInstance(errors)
+
+    data = build_model(tasks,
+                       time_limit=time_limit,
+                       allow_reassign=allow_reassign,
+                       maintenances=maintenances,
+                       staff_capacity=staff_capacity,
+                       time_granularity=time_granularity,
+                       opening_hours=opening_hours,
+                       breaks=breaks,
+                       params=params,
+                       tuned=tuned)
+    set_objective(data, objective, penalty_lateness)
+
+    model = data.model
     model.optimize()
 
     # ---  solution ---
-    solution = []
-    obj_val = None
-    if model.Status in [GRB.OPTIMAL, GRB.TIME_LIMIT]:
-        for i in J:
-            s_val = float(S[i].X) if S[i].X is not None else None
-            assigned_machine = tasks[i].get('machine')
-            if allow_reassign and y:
-                for m in Mset:
-                    if y[i,m].X > 0.5:
-                        assigned_machine = machines[m]
-                        break
-            solution.append({
-                "id": tasks[i]['id'],
-                "machine": assigned_machine,
-                "start": s_val,
-                "end": (s_val + p[i]) if s_val is not None else None,
-                "duration": p[i],
-                "priority": w[i],
-                "staff_group": staff[i],
-            })
-        obj_val = model.ObjVal
+    solution, obj_val = extract_solution(data)
+    if obj_val is not None:
         logger.info("Solved. Obj=%.2f", obj_val)
+        # independent check, mostly for TimeLimit incumbents
+        model._validation = validate_schedule(solution, tasks, maintenances, staff_capacity, opening_hours, breaks)
+        log_violations(model._validation, "Solution")
     else:
         logger.error("Solver status: %s", model.Status)
+        if model.Status in [GRB.INFEASIBLE, GRB.INF_OR_UNBD]:
+            try:
+                model._diagnosis = diagnose_infeasibility(data)
+                logger.error("Infeasible: %s", format_diagnosis(model._diagnosis))
+            except Exception:
+                logger.exception("IIS computation failed")
 
     return solution, obj_val, model
@@ -0,0 +1,123 @@
+# pareto.py - makespan vs weighted completion trade-off curve
+import logging
+import time
+from gurobipy import GRB
+
+from .model import (build_model, weighted_completion_expr, weighted_lateness_expr,
+                    set_warm_start, extract_solution, schedule_kpis)
+
+logger = logging.getLogger(__name__)
+
+
+def _dominates(a, b, keys):
+    return all(a[k] <= b[k] + 1e-6 for k in keys) and any(a[k] < b[k] - 1e-6 for k in keys)
+
+
+def non_dominated(points, keys=('cmax', 'weighted_completion')):
+    front = []
+    for pt in points:
+        if any(_dominates(o, pt, keys) for o in points if o is not pt):
+            continue
+        # drop exact duplicates
+        if any(all(abs(o[k] - pt[k]) <= 1e-6 for k in keys) for o in front):
+            continue
+        front.append(pt)
+    return sorted(front, key=lambda pt: [pt[k] for k in keys])
+
+
+def solve_pareto(tasks,
+                 time_limit=60,
+                 n_points=8,
+                 include_lateness=False,
+                 lateness_steps=3,
+                 allow_reassign=False,
+                 maintenances=None,
+                 staff_capacity=None,
+                 time_granularity=5,
+                 opening_hours=None,
+                 breaks=None,
+                 params=None,
+                 tuned=True):
+    # Epsilon-constraint sweep on a single model: minimise weighted completion
+    # subject to Cmax <= eps, with eps increasing from the optimal makespan so
+    # every point is a feasible MIP start for the next one.
+    # Returns the non-dominated points sorted by Cmax, each with its solution.
+    if not tasks:
+        return []
+
+    data = build_model(tasks,
+                       time_limit=time_limit,
+                       allow_reassign=allow_reassign,
+                       maintenances=maintenances,
+                       staff_capacity=staff_capacity,
+                       time_granularity=time_granularity,
+                       opening_hours=opening_hours,
+                       breaks=breaks,
+                       params=params,
+                       tuned=tuned)
+    model = data.model
+    wc = weighted_completion_expr(data)
+    late = weighted_lateness_expr(data)
+
+    cmax_con = model.addConstr(data.Cmax <= GRB.INFINITY, name='eps_cmax')
+    late_con = model.addConstr(late <= GRB.INFINITY, name='eps_lateness') if include_lateness else None
+
+    n_solves = 2 + max(0, n_points - 2) * (1 + (lateness_steps if include_lateness else 0))
+    deadline = time.monotonic() + time_limit
+    state = {'left': n_solves, 'last': None}
+    points = []
+
+    def run(obj, tag):
+        remaining = max(0.0, deadline - time.monotonic())
+        model.Params.TimeLimit = max(0.5, remaining / max(1, state['left']))
+        state['left'] -= 1
+        model.setObjective(obj, GRB.MINIMIZE)
+        if state['last']:
+            set_warm_start(data, state['last'])
+        model.optimize()
+        solution, _ = extract_solution(data)
+        if not solution:
+            logger.info("Pareto %s: no solution (status %s)", tag, model.Status)
+            return None
+        state['last'] = solution
+        point = schedule_kpis(solution, tasks)
+        point.update({'solution': solution, 'status': model.Status, 'tag': tag})
+        points.append(point)
+        logger.info("Pareto %s: Cmax=%.2f WC=%.2f late=%.2f", tag,
+                    point['cmax'], point['weighted_completion'], point['lateness'])
+        return point
+
+    # anchor 1: best makespan, then best weighted completion at that makespan
+    first = run(data.Cmax, 'cmax_min')
+    if first is None:
+        return []
+    cmax_con.RHS = first['cmax']
+    lo = run(wc, 'lex_cmax') or first
+
+    # anchor 2: best weighted completion without makespan bound
+    cmax_con.RHS = GRB.INFINITY
+    hi = run(wc, 'wc_min')
+    if hi is None:
+        return non_dominated(points)
+
+    c_lo, c_hi = lo['cmax'], hi['cmax']
+    # restart the sweep from the low-makespan end so the warm start stays feasible
+    state['last'] = lo['solution']
+    if n_points > 2 and c_hi - c_lo > 1e-6:
+        step = (c_hi - c_lo) / (n_points - 1)
+        for j in range(1, n_points - 1):
+            eps = c_lo + j * step
+            cmax_con.RHS = eps
+            if late_con is not None:
+                late_con.RHS = GRB.INFINITY
+            pt = run(wc, f'eps_{j}')
+            if pt is None or late_con is None or pt['lateness'] <= 1e-6:
+                continue
+            base = pt['solution']
+            for q in range(1, lateness_steps + 1):
+                late_con.RHS = pt['lateness'] * (1.0 - q / (lateness_steps + 1))
+                run(wc, f'eps_{j}_late_{q}')
+            state['last'] = base
+
+    keys = ('cmax', 'weighted_completion', 'lateness') if include_lateness else ('cmax', 'weighted_completion')
+    return non_dominated(points, keys)
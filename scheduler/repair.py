@@ -0,0 +1,244 @@
+# repair.py - fast local rescheduling (urgent insertions, machine outages)
+import logging
+from gurobipy import GRB, quicksum
+
+from .intervals import build_availability, DAY, INF
+from .model import build_model, set_warm_start, extract_solution
+from .validator import validate_schedule, log_violations
+
+logger = logging.getLogger(__name__)
+
+
+def _right_shift(entries, anchors, tasks_by_id, avail, staff_capacity=None):
+    # push tail tasks later (in their original start order) until they clear
+    # the anchors and already placed tail tasks on their machine, unavailable
+    # windows, setup_after predecessors (any machine) and staff capacity.
+    # Returns (shifted ids, ids that cannot be placed on their machine).
+    shifted, stuck = [], []
+    ends = {a['id']: a['end'] for a in anchors}
+    busy = {}
+    staff = {}
+    for a in anchors:
+        busy.setdefault(a['machine'], []).append((a['start'], a['end']))
+        if a.get('staff_group'):
+            staff.setdefault(a['staff_group'], []).append((a['start'], a['end']))
+    for e in sorted(entries, key=lambda s: s['start']):
+        p = e['duration']
+        st = e['start']
+        for other, setup in (tasks_by_id.get(e['id'], {}).get('setup_after') or {}).items():
+            if other in ends and float(setup) > 0:
+                st = max(st, ends[other] + float(setup))
+        grp = e.get('staff_group')
+        cap = (staff_capacity or {}).get(grp) if grp else None
+        moved = True
+        while moved and st != INF:
+            moved = False
+            for a, b in busy.get(e['machine'], []):
+                if st < b and st + p > a:
+                    st, moved = b, True
+            for a, b, _ in avail.overlapping(e['machine'], st, st + p):
+                st, moved = b, True
+                break
+            if cap is not None:
+                running = [b for a, b in staff.get(grp, []) if a < st + p and b > st]
+                if len(running) >= int(cap):
+                    # capacity only frees up when one of them ends
+                    st, moved = min(running), True
+        if st == INF:
+            stuck.append(e['id'])
+            continue
+        if st > e['start'] + 1e-9:
+            shifted.append(e['id'])
+        e['start'] = st
+        e['end'] = st + p
+        ends[e['id']] = e['end']
+        busy.setdefault(e['machine'], []).append((e['start'], e['end']))
+        if grp:
+            staff.setdefault(grp, []).append((e['start'], e['end']))
+    return shifted, stuck
+
+
+def repair_schedule(tasks,
+                    solution,
+                    new_tasks=None,
+                    outages=None,
+                    now=0.0,
+                    freeze=15.0,
+                    window=120.0,
+                    time_limit=1.0,
+                    allow_reassign=False,
+                    disruption_weight=1.0,
+                    machine_change_penalty=50.0,
+                    penalty_lateness=0.0,
+                    maintenances=None,
+                    staff_capacity=None,
+                    time_granularity=5,
+                    opening_hours=None,
+                    breaks=None,
+                    movable_ids=None,
+                    params=None,
+                    tuned=True):
+    # Re-plans only the window [now, now + freeze + window] around an existing
+    # solution. Tasks starting before now + freeze stay frozen, tasks in the
+    # window (plus new tasks and tasks hit by an outage) are re-optimised in a
+    # small sub-MIP, later tasks are only shifted right if needed.
+    # outages: [{'machine': 'Scanner2', 'start': 600, 'end': 720}] (end None = rest of day)
+    # movable_ids: tasks to re-plan whatever their start (used when the
+    # right-shifted tail still breaks a constraint).
+    # Returns (solution, obj_val, info) with the ids frozen / repaired / shifted / moved;
+    # info['failed'] is True (with the Gurobi status) when the sub-MIP found no
+    # solution and the input plan is returned unchanged.
+    new_tasks = list(new_tasks or [])
+    outages = list(outages or [])
+    force = set(movable_ids or ())
+    tasks_by_id = {t['id']: t for t in tasks}
+    tasks_by_id.update({t['id']: t for t in new_tasks})
+    old = {s['id']: dict(s) for s in solution if s.get('start') is not None}
+
+    lock = now + freeze
+    window_end = lock + window
+    max_p = max([float(t.get('duration', 1.0)) for t in tasks_by_id.values()] or [0.0])
+
+    def hit_by_outage(s):
+        for o in outages:
+            o_start = float(o.get('start', now))
+            o_end = o.get('end')
+            o_end = float(o_end) if o_end is not None else float('inf')
+            if s['machine'] == o.get('machine') and s['start'] >= now and s['start'] < o_end and s['end'] > o_start:
+                return True
+        return False
+
+    frozen, movable, tail = [], [], []
+    for tid, s in old.items():
+        if hit_by_outage(s) or (tid in force and s['start'] >= now):
+            movable.append(tid)
+        elif s['start'] < lock:
+            frozen.append(tid)
+        elif s['start'] < window_end:
+            movable.append(tid)
+        else:
+            tail.append(tid)
+    movable += [t['id'] for t in new_tasks]
+
+    if outages and not allow_reassign and any(o.get('end') is None for o in outages):
+        raise ValueError("An open-ended outage needs allow_reassign=True")
+
+    # context: fixed tasks the window can collide with
+    movable_set = set(movable)
+    machines = {old[tid]['machine'] if tid in old else tasks_by_id[tid].get('machine') for tid in movable}
+    groups = {tasks_by_id[tid].get('staff_group') for tid in movable}
+    referenced = set()
+    for tid in movable:
+        referenced.update((tasks_by_id[tid].get('setup_after') or {}).keys())
+    context = []
+    for tid in frozen + tail:
+        s = old[tid]
+        near = s['end'] > now and s['start'] < window_end + max_p
+        related = allow_reassign or s['machine'] in machines or (staff_capacity and s.get('staff_group') in groups)
+        if (near and related) or tid in referenced:
+            context.append(tid)
+
+    sub_tasks = []
+    for tid in movable:
+        t = dict(tasks_by_id[tid])
+        if tid in old:
+            t['machine'] = old[tid]['machine']
+        t['release'] = max(float(t.get('release', 0.0)), now)
+        sub_tasks.append(t)
+    for tid in context:
+        t = dict(tasks_by_id.get(tid, {'id': tid}))
+        t['machine'] = old[tid]['machine']
+        t['duration'] = old[tid]['duration']
+        t['release'] = old[tid]['start']
+        sub_tasks.append(t)
+
+    info = {'frozen': frozen, 'repaired': movable, 'shifted': [], 'moved': [], 'failed': False}
+    if not movable:
+        return [dict(s) for s in solution], None, info
+
+    # outages are blocks like maintenances; build_model only applies blocks
+    # to the re-planned tasks, never to the fixed context
+    blocks = list(maintenances or []) + [{'machine': o.get('machine'), 'start': o.get('start', now), 'end': o.get('end')}
+                                         for o in outages]
+    data = build_model(sub_tasks,
+                       time_limit=time_limit,
+                       allow_reassign=allow_reassign,
+                       maintenances=blocks,
+                       staff_capacity=staff_capacity,
+                       time_granularity=time_granularity,
+                       opening_hours=opening_hours,
+                       breaks=breaks,
+                       fixed={i: old[sub_tasks[i]['id']]['start'] for i in range(len(movable), len(sub_tasks))},
+                       params=params,
+                       tuned=tuned,
+                       latest_cuts=False,
+                       min_horizon=max([old[t['id']]['end'] for t in sub_tasks if t['id'] in old] + [now]))
+    model, S, y = data.model, data.S, data.y
+    n_mov = len(movable)
+
+    # objective: serve new tasks early, move existing ones as little as possible
+    D = model.addVars(range(n_mov), lb=0.0, vtype=GRB.CONTINUOUS, name='Deviation')
+    obj = []
+    for i in range(n_mov):
+        tid = sub_tasks[i]['id']
+        if tid in old:
+            model.addConstr(D[i] >= S[i] - old[tid]['start'])
+            model.addConstr(D[i] >= old[tid]['start'] - S[i])
+            obj.append(disruption_weight * data.w[i] * D[i])
+            if y is not None and old[tid]['machine'] in data.machine_idx:
+                obj.append(machine_change_penalty * (1 - y[i, data.machine_idx[old[tid]['machine']]]))
+        else:
+            obj.append(data.w[i] * (S[i] + data.p[i]))
+        if penalty_lateness and penalty_lateness > 0:
+            obj.append(penalty_lateness * data.w[i] * data.L[i])
+    model.setObjective(quicksum(obj), GRB.MINIMIZE)
+    set_warm_start(data, [old[t] for t in movable + context if t in old])
+
+    model.optimize()
+    sub_solution, obj_val = extract_solution(data)
+    if obj_val is None:
+        logger.error("Repair failed, solver status: %s", model.Status)
+        info.update(failed=True, status=model.Status)
+        return [dict(s) for s in solution], None, info
+
+    repaired = {s['id']: s for s in sub_solution[:n_mov]}
+    anchors = [old[tid] for tid in frozen] + list(repaired.values())
+    tail_entries = [dict(old[tid]) for tid in tail]
+    horizon = max([s['end'] for s in old.values()] + [s['end'] for s in repaired.values()] + [now])
+    horizon += sum(e['duration'] for e in tail_entries) + DAY
+    avail = build_availability(2 * horizon, blocks, opening_hours, breaks)
+    info['shifted'], stuck = _right_shift(tail_entries, anchors, tasks_by_id, avail, staff_capacity)
+    tail_by_id = {e['id']: e for e in tail_entries if e['id'] not in stuck}
+
+    result = []
+    for s in solution:
+        tid = s['id']
+        if tid in repaired:
+            entry = dict(s)
+            entry.update({k: repaired[tid][k] for k in ('machine', 'start', 'end')})
+        elif tid in tail_by_id:
+            entry = tail_by_id[tid]
+        elif tid in stuck:
+            entry = dict(s)
+        else:
+            entry = dict(s)
+        if tid in old and (abs(entry['start'] - old[tid]['start']) > 1e-6 or entry['machine'] != old[tid]['machine']):
+            info['moved'].append(tid)
+        result.append(entry)
+    result += [repaired[t['id']] for t in new_tasks if t['id'] in repaired]
+
+    # the right-shifted tail is outside the sub-MIP: tail tasks that still
+    # break a constraint are re-planned in the sub-MIP on a second pass
+    report = validate_schedule(result, list(tasks) + new_tasks, blocks, staff_capacity, opening_hours, breaks)
+    bad = {tid for v in report['violations'] for tid in v['task_ids'] if tid in tail_by_id or tid in stuck}
+    if bad - force:
+        logger.info("Right shift left %d tail task(s) in conflict, repairing them too", len(bad - force))
+        return repair_schedule(tasks, solution, new_tasks, outages, now, freeze, window, time_limit, allow_reassign,
+                               disruption_weight, machine_change_penalty, penalty_lateness, maintenances,
+                               staff_capacity, time_granularity, opening_hours, breaks, force | bad, params, tuned)
+    log_violations(report, "Repaired schedule")
+    info['violations'] = report['violations']
+
+    logger.info("Repaired %d tasks (%d moved, %d shifted) in %.2fs",
+                len(movable), len(info['moved']), len(info['shifted']), model.Runtime)
+    return result, obj_val, info
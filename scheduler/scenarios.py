@@ -0,0 +1,183 @@
+# scenarios.py - batch what-if analysis over one base task set
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .screening import screen_instance, format_issues
+from .validator import validate_schedule
+
+logger = logging.getLogger(__name__)
+
+# per-worker copy of the shared preprocessing, set once by _init_worker
+_BASE = None
+
+
+def normalize_tasks(tasks, known_ids=()):
+    # numeric fields as floats, setup_after restricted to known ids
+    ids = {t['id'] for t in tasks} | set(known_ids)
+    out = []
+    for t in tasks:
+        n = dict(t)
+        n['duration'] = float(t.get('duration', 1.0))
+        n['release'] = float(t.get('release', 0.0))
+        n['priority'] = float(t.get('priority', 1.0))
+        if t.get('deadline') not in [None, '']:
+            n['deadline'] = float(t['deadline'])
+        else:
+            n.pop('deadline', None)
+        n['setup_after'] = {k: float(v) for k, v in (t.get('setup_after') or {}).items() if k in ids}
+        out.append(n)
+    return out
+
+
+def apply_scenario(tasks, scenario, maintenances=None, staff_capacity=None):
+    # Perturbations understood in a scenario dict:
+    #   outages:          [{'machine', 'start', 'end'}] added to the maintenances
+    #   staff_capacity:   {group: capacity} absolute values
+    #   staff_delta:      {group: +/- n} relative to the base capacity
+    #   duration_factor:  float for every task, or {task id or machine: factor}
+    #   walk_ins:         extra tasks
+    tasks = [dict(t) for t in tasks]
+    maint = list(maintenances or []) + list(scenario.get('outages') or [])
+    cap = dict(staff_capacity or {})
+    cap.update(scenario.get('staff_capacity') or {})
+    for grp, delta in (scenario.get('staff_delta') or {}).items():
+        if grp not in cap:
+            raise ValueError(f"staff_delta on {grp!r}, which has no base capacity (use staff_capacity)")
+        cap[grp] = max(0, int(cap[grp]) + int(delta))
+
+    factor = scenario.get('duration_factor')
+    if factor is not None:
+        for t in tasks:
+            if isinstance(factor, dict):
+                f = factor.get(t['id'], factor.get(t.get('machine'), 1.0))
+            else:
+                f = factor
+            t['duration'] = float(t['duration']) * float(f)
+
+    if scenario.get('walk_ins'):
+        tasks += normalize_tasks(scenario['walk_ins'], known_ids=[t['id'] for t in tasks])
+    return tasks, maint, cap
+
+
+def scenario_kpis(solution, tasks, maintenances=None, staff_capacity=None, opening_hours=None, breaks=None):
+    report = validate_schedule(solution, tasks, maintenances, staff_capacity, opening_hours, breaks)
+    kpis = report['kpis']
+    return {'makespan': kpis['makespan'],
+            'lateness': kpis['total_lateness'],
+            'utilization': {m: k['utilization'] for m, k in kpis['machines'].items()},
+            'violations': len(report['violations'])}
+
+
+def _init_worker(base):
+    global _BASE
+    _BASE = base
+
+
+def _solve_scenario(scenario):
+    row = {'scenario': scenario.get('name', ''), 'status': None, 'obj': None}
+    try:
+        return _solve_scenario_row(scenario, row)
+    except Exception as e:  # one bad scenario must not abort the batch
+        logger.exception("Scenario %s failed", row['scenario'])
+        row['status'] = 'error'
+        row['message'] = str(e)
+        return row
+
+
+def _solve_scenario_row(scenario, row):
+    from gurobipy import GRB
+    from .model import build_model, set_objective, set_warm_start, extract_solution
+
+    tasks, maint, cap = apply_scenario(_BASE['tasks'], scenario, _BASE['maintenances'], _BASE['staff_capacity'])
+    errors = [iss for iss in screen_instance(tasks, _BASE['allow_reassign'], maint, cap) if iss['severity'] == 'error']
+    if errors:
+        row['status'] = 'rejected'
+        row['message'] = format_issues(errors)
+        return row
+
+    data = build_model(tasks,
+                       time_limit=_BASE['time_limit'],
+                       allow_reassign=_BASE['allow_reassign'],
+                       maintenances=maint,
+                       staff_capacity=cap,
+                       time_granularity=_BASE['time_granularity'],
+                       opening_hours=_BASE['opening_hours'],
+                       breaks=_BASE['breaks'],
+                       params=_BASE['params'],
+                       tuned=_BASE['tuned'])
+    set_objective(data, _BASE['objective'], _BASE['penalty_lateness'])
+    data.model.Params.Threads = _BASE['threads']
+    if _BASE['base_solution']:
+        set_warm_start(data, _BASE['base_solution'])
+    data.model.optimize()
+    solution, obj_val = extract_solution(data)
+    status_names = {GRB.OPTIMAL: 'optimal', GRB.TIME_LIMIT: 'time_limit', GRB.INFEASIBLE: 'infeasible',
+                    GRB.INF_OR_UNBD: 'infeasible_or_unbounded', GRB.INTERRUPTED: 'interrupted'}
+    row['status'] = status_names.get(data.model.Status, f"status {data.model.Status}")
+    row['obj'] = obj_val
+    if solution:
+        row.update(scenario_kpis(solution, tasks, maint, cap, _BASE['opening_hours'], _BASE['breaks']))
+        row['solution'] = solution
+    return row
+
+
+def run_scenarios(tasks,
+                  scenarios,
+                  time_limit=30,
+                  objective="weighted_completion",
+                  workers=None,
+                  base_solution=None,
+                  allow_reassign=False,
+                  penalty_lateness=0.0,
+                  maintenances=None,
+                  staff_capacity=None,
+                  time_granularity=5,
+                  opening_hours=None,
+                  breaks=None,
+                  params=None,
+                  tuned=True):
+    # Solves every scenario in a process pool. The base task set is normalised
+    # and screened once and handed to each worker once (not per scenario);
+    # base_solution, if given, warm-starts every scenario.
+    # Returns one row per scenario, in input order.
+    base_tasks = normalize_tasks(tasks)
+    for iss in screen_instance(base_tasks, allow_reassign, maintenances, staff_capacity):
+        logger.warning("Base instance: %s", iss['message'])
+
+    workers = workers or min(len(scenarios), os.cpu_count() or 1) or 1
+    base = {
+        'tasks': base_tasks,
+        'maintenances': list(maintenances or []),
+        'staff_capacity': dict(staff_capacity or {}),
+        'base_solution': base_solution,
+        'objective': objective,
+        'time_limit': time_limit,
+        'allow_reassign': allow_reassign,
+        'penalty_lateness': penalty_lateness,
+        'time_granularity': time_granularity,
+        'opening_hours': opening_hours,
+        'breaks': breaks,
+        'params': params,
+        'tuned': tuned,
+        'threads': max(1, (os.cpu_count() or 1) // workers),
+    }
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(base,)) as pool:
+        rows = list(pool.map(_solve_scenario, scenarios))
+    for row in rows:
+        logger.info("Scenario %s: %s", row['scenario'], row['status'])
+    return rows
+
+
+def kpi_matrix(rows):
+    # scenario x KPI table: (scenario names, column names, values)
+    machines = sorted({m for row in rows for m in (row.get('utilization') or {})}, key=str)
+    columns = ['makespan', 'lateness'] + [f"util:{m}" for m in machines]
+    values = []
+    for row in rows:
+        util = row.get('utilization') or {}
+        values.append([row.get('makespan'), row.get('lateness')] + [util.get(m, 0.0) if util else None for m in machines])
+    return [row['scenario'] for row in rows], columns, values
@@ -0,0 +1,295 @@
+# screening.py - fast feasibility checks run before the MIP is built
+import logging
+from bisect import bisect_right
+
+from .intervals import AvailabilityIndex, INF
+
+logger = logging.getLogger(__name__)
+
+
+class InfeasibleInstance(ValueError):
+    def __init__(self, issues):
+        self.issues = issues
+        super().__init__(format_issues(issues))
+
+
+def _issue(severity, code, message, task_ids=()):
+    return {'severity': severity, 'code': code, 'message': message, 'task_ids': list(task_ids)}
+
+
+def _to_float(val, default=None):
+    if val in [None, '']:
+        return default
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return default
+
+
+def _setup_cycle(tasks, ids):
+    # setup_after is a hard precedence in the model, so any cycle is infeasible
+    graph = {t['id']: [k for k, v in (t.get('setup_after') or {}).items()
+                       if k in ids and (_to_float(v, 0.0) or 0.0) > 0] for t in tasks}
+    state = {}
+    for root in graph:
+        if state.get(root):
+            continue
+        stack = [(root, iter(graph[root]))]
+        path = [root]
+        state[root] = 1
+        while stack:
+            node, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                state[node] = 2
+                stack.pop()
+                path.pop()
+            elif state.get(nxt) == 1:
+                return path[path.index(nxt):] + [nxt]
+            elif not state.get(nxt):
+                state[nxt] = 1
+                stack.append((nxt, iter(graph.get(nxt, []))))
+                path.append(nxt)
+    return None
+
+
+class _MaxTree:
+    # max over n slots with range add and point assignment (-inf = unset)
+
+    def __init__(self, n):
+        self.n = n
+        self.mx = [-INF] * (4 * max(1, n))
+        self.add = [0.0] * (4 * max(1, n))
+
+    def range_add(self, lo, hi, val, node=1, nl=0, nr=None):
+        nr = self.n if nr is None else nr
+        if hi <= nl or nr <= lo:
+            return
+        if lo <= nl and nr <= hi:
+            self.add[node] += val
+            self.mx[node] += val
+            return
+        mid = (nl + nr) // 2
+        self.range_add(lo, hi, val, 2 * node, nl, mid)
+        self.range_add(lo, hi, val, 2 * node + 1, mid, nr)
+        self.mx[node] = max(self.mx[2 * node], self.mx[2 * node + 1]) + self.add[node]
+
+    def assign(self, j, val, node=1, nl=0, nr=None):
+        nr = self.n if nr is None else nr
+        if nr - nl == 1:
+            self.mx[node], self.add[node] = val, 0.0
+            return
+        val -= self.add[node]
+        mid = (nl + nr) // 2
+        if j < mid:
+            self.assign(j, val, 2 * node, nl, mid)
+        else:
+            self.assign(j, val, 2 * node + 1, mid, nr)
+        self.mx[node] = max(self.mx[2 * node], self.mx[2 * node + 1]) + self.add[node]
+
+    def argmax(self):
+        # (max, leftmost slot holding it)
+        node, nl, nr = 1, 0, self.n
+        while nr - nl > 1:
+            target = self.mx[node] - self.add[node]
+            mid = (nl + nr) // 2
+            if self.mx[2 * node] == target:
+                node, nr = 2 * node, mid
+            else:
+                node, nl = 2 * node + 1, mid
+        return self.mx[1], nl
+
+
+def _window_overload(items, blocks=None, cap=1):
+    # items: (release, deadline, duration); for each release r0 check that the
+    # work released after r0 and due before d fits between r0 and d
+    # (blocks: merged, sorted (start, end) unavailable intervals).
+    # Releases are swept from the latest down: each task adds its duration to
+    # every deadline from its own on, and the tree keeps load(d) - free(d) per
+    # deadline, so the worst window for r0 is one max query (O(n log n)).
+    due = sorted({d for r, d, p in items if d is not None})
+    if not due:
+        return None
+    times = [r for r, d, p in items] + due
+    base, top = min(times), max(times)
+    # blocked time up to t from prefix sums (open-ended blocks cut at the last
+    # time looked at)
+    spans = [(a, min(b, top)) for a, b in blocks or [] if a < top]
+    starts = [a for a, b in spans]
+    done = [0.0]
+    for a, b in spans:
+        done.append(done[-1] + b - a)
+
+    def blocked_to(t):
+        k = bisect_right(starts, t)
+        return done[k] - (max(0.0, spans[k - 1][1] - t) if k else 0.0)
+
+    def free(t):
+        # capacity-weighted free time in [base, t]
+        return cap * (t - base - (blocked_to(t) - blocked_to(base)))
+
+    m = len(due)
+    slot = {d: j for j, d in enumerate(due)}
+    free_due = [free(d) for d in due]
+    tree = _MaxTree(m)
+    # a deadline's slot is set when its first task comes in, from the load
+    # added so far up to it (Fenwick prefix sums)
+    fenwick = [0.0] * (m + 1)
+    active = set()
+    by_release = {}
+    for r, d, p in items:
+        by_release.setdefault(r, []).append((d, p))
+
+    worst = None
+    for r0 in sorted(by_release, reverse=True):
+        for d, p in by_release[r0]:
+            if d is None:
+                continue
+            j = slot[d]
+            k = j + 1
+            while k <= m:
+                fenwick[k] += p
+                k += k & -k
+            tree.range_add(j, m, p)
+            if j not in active:
+                active.add(j)
+                load, k = 0.0, j + 1
+                while k > 0:
+                    load += fenwick[k]
+                    k -= k & -k
+                tree.assign(j, load - free_due[j])
+        value, j = tree.argmax()
+        excess = value + free(r0)
+        if value > -INF and excess > 1e-6 and (worst is None or excess >= worst[2]):
+            worst = (r0, due[j], excess)
+    return worst
+
+
+def screen_instance(tasks, allow_reassign=False, maintenances=None, staff_capacity=None):
+    # Returns a list of issues {'severity': 'error'|'warning', 'code', 'message', 'task_ids'}.
+    # Errors make the model infeasible (or ill-defined); warnings only mean
+    # that some soft deadline cannot be met.
+    issues = []
+    ids = [t.get('id') for t in tasks]
+    id_set = set(ids)
+
+    seen, dups = set(), set()
+    for tid in ids:
+        (dups if tid in seen else seen).add(tid)
+    if dups:
+        issues.append(_issue('error', 'duplicate_id', f"IDs en double: {sorted(dups, key=str)}", dups))
+
+    for t in tasks:
+        p = _to_float(t.get('duration', 1.0))
+        if p is None or p < 0:
+            issues.append(_issue('error', 'bad_duration', f"{t.get('id')}: durée invalide {t.get('duration')!r}", [t.get('id')]))
+        unknown = [k for k in (t.get('setup_after') or {}) if k not in id_set]
+        if unknown:
+            issues.append(_issue('warning', 'unknown_setup_ref',
+                                 f"{t.get('id')}: setup_after référence des IDs inconnus {unknown}", [t.get('id')]))
+        if t.get('id') in (t.get('setup_after') or {}) and (_to_float(t['setup_after'][t['id']], 0.0) or 0.0) > 0:
+            issues.append(_issue('error', 'setup_self', f"{t.get('id')}: setup_after sur lui-même", [t.get('id')]))
+
+    cycle = _setup_cycle(tasks, id_set)
+    if cycle and len(cycle) > 2:
+        issues.append(_issue('error', 'setup_cycle', f"Cycle de setup_after: {' -> '.join(map(str, cycle))}", cycle[:-1]))
+
+    # staff groups
+    groups = {}
+    for t in tasks:
+        groups.setdefault(t.get('staff_group'), []).append(t)
+    for grp, cap in (staff_capacity or {}).items():
+        cap_val = _to_float(cap)
+        members = [t['id'] for t in groups.get(grp, [])]
+        if cap_val is None or cap_val < 0:
+            issues.append(_issue('error', 'bad_staff_capacity', f"Capacité invalide pour {grp}: {cap!r}", members))
+        elif int(cap_val) == 0 and members:
+            issues.append(_issue('error', 'zero_staff_capacity',
+                                 f"{grp} a une capacité 0 mais {len(members)} tâche(s)", members))
+
+    # maintenances
+    machines = {t.get('machine') for t in tasks if t.get('machine') is not None}
+    for t in tasks:
+        machines.update(t.get('eligible_machines') or [])
+    per_machine = {}
+    for b in maintenances or []:
+        a = _to_float(b.get('start'))
+        e = INF if b.get('end') is None else _to_float(b.get('end'))
+        if a is None or e is None or e <= a:
+            issues.append(_issue('error', 'bad_maintenance', f"Maintenance invalide: {b}"))
+            continue
+        if b.get('machine') is not None and b.get('machine') not in machines:
+            issues.append(_issue('warning', 'unknown_maintenance_machine',
+                                 f"Maintenance sur une machine inconnue: {b.get('machine')}"))
+        per_machine.setdefault(b.get('machine'), []).append((a, e))
+    for m, lst in per_machine.items():
+        lst.sort()
+        for (a1, e1), (a2, e2) in zip(lst, lst[1:]):
+            if a2 < e1:
+                issues.append(_issue('warning', 'maintenance_overlap',
+                                     f"Maintenances qui se chevauchent sur {m}: [{a1}, {e1}] et [{a2}, {e2}]"))
+    index = AvailabilityIndex()
+    for m, lst in per_machine.items():
+        for a, e in lst:
+            index.add(m, a, e)
+
+    # open-ended blocks: a task must finish before one on at least one usable machine
+    closed_at = {}
+    for m, lst in per_machine.items():
+        for a, e in lst:
+            if e == INF:
+                closed_at[m] = min(closed_at.get(m, INF), a)
+    if closed_at:
+        for t in tasks:
+            if allow_reassign:
+                usable = t.get('eligible_machines') or sorted(machines, key=str)
+            else:
+                usable = [t.get('machine')] if t.get('machine') is not None else []
+            if not usable:
+                continue
+            finish = _to_float(t.get('release'), 0.0) + (_to_float(t.get('duration', 1.0), 0.0) or 0.0)
+            if all(finish > min(closed_at.get(m, INF), closed_at.get(None, INF)) for m in usable):
+                issues.append(_issue('error', 'machine_closed',
+                                     f"{t.get('id')}: ne peut finir avant l'arrêt définitif de {', '.join(map(str, usable))}",
+                                     [t.get('id')]))
+
+    # capacity against release/deadline windows (deadlines are soft -> warnings)
+    if not allow_reassign:
+        by_machine = {}
+        for t in tasks:
+            if t.get('machine') is None:
+                continue
+            by_machine.setdefault(t.get('machine'), []).append(
+                (_to_float(t.get('release'), 0.0), _to_float(t.get('deadline')), _to_float(t.get('duration', 1.0), 0.0)))
+        for m, items in by_machine.items():
+            worst = _window_overload(items, [(a, b) for a, b, _ in index.blocks(m)])
+            if worst:
+                issues.append(_issue('warning', 'machine_overload',
+                                     f"{m}: {worst[2]:.1f} min de travail en trop entre {worst[0]:.0f} et {worst[1]:.0f}"))
+    for grp, cap in (staff_capacity or {}).items():
+        cap_val = _to_float(cap)
+        if not cap_val or cap_val <= 0:
+            continue
+        items = [(_to_float(t.get('release'), 0.0), _to_float(t.get('deadline')), _to_float(t.get('duration', 1.0), 0.0))
+                 for t in groups.get(grp, [])]
+        worst = _window_overload(items, None, int(cap_val))
+        if worst:
+            issues.append(_issue('warning', 'staff_overload',
+                                 f"{grp}: {worst[2]:.1f} min de travail en trop entre {worst[0]:.0f} et {worst[1]:.0f}"))
+
+    return issues
+
+
+def format_issues(issues):
+    return '\n'.join(f"[{iss['severity']}] {iss['message']}" for iss in issues)
+
+
+def format_diagnosis(diag):
+    fams = ', '.join(f"{k}: {v}" for k, v in sorted(diag['families'].items()))
+    lines = [f"Modèle infaisable (IIS: {fams})"]
+    if diag['task_ids']:
+        lines.append(f"Tâches concernées: {', '.join(map(str, diag['task_ids']))}")
+    for d in diag['constraints']:
+        if d['note']:
+            lines.append(f"  {d['family']}: {d['note']}")
+    return '\n'.join(lines)
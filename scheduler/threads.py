@@ -1,7 +1,10 @@
 # threads.py (additions)
 from PySide6.QtCore import QThread, Signal
 import logging
-from .model import solve_multi_machine
+import multiprocessing
+import queue
+import time
+from .screening import format_diagnosis
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +21,16 @@ class SolveThread(QThread):
 
     def run(self):
         try:
+            # gurobipy is only loaded on the first solve, not at GUI start-up
+            from .model import solve_multi_machine
             sol, obj, model = solve_multi_machine(self.tasks,
                                                  time_limit=self.time_limit,
                                                  objective=self.objective,
                                                  **self.kwargs)
+            if obj is None and model is not None:
+                diag = getattr(model, '_diagnosis', None)
+                self.error_signal.emit(format_diagnosis(diag) if diag else f"Aucune solution (statut Gurobi {model.Status})")
+                return
             self.finished_signal.emit(sol, obj)
         except Exception as e:
             logger.exception("Solver thread exception")
@@ -41,6 +50,7 @@ class CompareThread(QThread):
 
     def run(self):
         try:
+            from .model import solve_multi_machine
             results = {}
             for obj in self.objectives:
                 extra = self.kwargs_per_obj.get(obj, {})
@@ -53,3 +63,131 @@ class CompareThread(QThread):
         except Exception as e:
             logger.exception("CompareThread exception")
             self.error_signal.emit(str(e))
+
+class ParetoThread(QThread):
+
+    finished_signal = Signal(object)   # list of Pareto points
+    error_signal = Signal(str)
+
+    def __init__(self, tasks, time_limit=60, n_points=8, **kwargs):
+        super().__init__()
+        self.tasks = tasks
+        self.time_limit = time_limit
+        self.n_points = n_points
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            from .pareto import solve_pareto
+            points = solve_pareto(self.tasks,
+                                  time_limit=self.time_limit,
+                                  n_points=self.n_points,
+                                  **self.kwargs)
+            self.finished_signal.emit(points)
+        except Exception as e:
+            logger.exception("ParetoThread exception")
+            self.error_signal.emit(str(e))
+
+class ExportThread(QThread):
+    # Queue of report exports. Each job is rendered in its own worker process
+    # (Agg backend, see exporter.render_job) so the GUI stays responsive;
+    # this thread only forwards the worker's events as signals.
+
+    progress_signal = Signal(int, int, int)   # job id, pages done, total (0 = unknown)
+    finished_signal = Signal(int, str)        # job id, written path
+    cancelled_signal = Signal(int)
+    error_signal = Signal(int, str)
+
+    def __init__(self):
+        super().__init__()
+        self._ctx = multiprocessing.get_context('spawn')
+        self._jobs = queue.Queue()
+        self._next_id = 0
+        self._cancelled = set()
+        self._current = None
+        self._stopping = False
+
+    def enqueue(self, kind, payload, path):
+        self._next_id += 1
+        self._jobs.put((self._next_id, kind, payload, path))
+        return self._next_id
+
+    def pending(self):
+        return self._jobs.qsize() + (1 if self._current else 0)
+
+    def cancel(self, job_id=None):
+        # job_id None cancels the running job and everything queued
+        if job_id is None:
+            self._cancelled.update(range(1, self._next_id + 1))
+        else:
+            self._cancelled.add(job_id)
+        current = self._current
+        if current and (job_id is None or current[0] == job_id):
+            current[1].set()
+
+    def stop(self):
+        self._stopping = True
+        self.cancel()
+        self._jobs.put(None)
+        self.wait(5000)
+
+    def run(self):
+        while not self._stopping:
+            job = self._jobs.get()
+            if job is None:
+                break
+            job_id, kind, payload, path = job
+            if job_id in self._cancelled:
+                self.cancelled_signal.emit(job_id)
+                continue
+            try:
+                self._run_job(job_id, kind, payload, path)
+            except Exception as e:
+                logger.exception("Export worker failed")
+                self.error_signal.emit(job_id, str(e))
+            finally:
+                self._current = None
+
+    def _run_job(self, job_id, kind, payload, path):
+        from .exporter import render_job
+        events = self._ctx.Queue()
+        cancel_event = self._ctx.Event()
+        proc = self._ctx.Process(target=render_job,
+                                 args=(job_id, kind, payload, path, events, cancel_event),
+                                 daemon=True)
+        self._current = (job_id, cancel_event)
+        proc.start()
+        killed_at = None
+        while True:
+            try:
+                ev = events.get(timeout=0.1)
+            except queue.Empty:
+                if cancel_event.is_set():
+                    # give the worker a moment to stop at a page boundary, then kill it
+                    killed_at = killed_at or time.monotonic()
+                    if time.monotonic() - killed_at > 2.0:
+                        proc.terminate()
+                        proc.join()
+                        self.cancelled_signal.emit(job_id)
+                        return
+                if not proc.is_alive() and events.empty():
+                    proc.join()
+                    if cancel_event.is_set():
+                        self.cancelled_signal.emit(job_id)
+                    else:
+                        self.error_signal.emit(job_id, f"Export interrompu (code {proc.exitcode})")
+                    return
+                continue
+            if ev[0] == 'progress':
+                self.progress_signal.emit(job_id, ev[2], ev[3] or 0)
+                continue
+            proc.join()
+            if ev[0] == 'done':
+                logger.info("Export %d written to %s", job_id, ev[2])
+                self.finished_signal.emit(job_id, ev[2])
+            elif ev[0] == 'cancelled':
+                self.cancelled_signal.emit(job_id)
+            else:
+                logger.error("Export %d failed: %s", job_id, ev[2])
+                self.error_signal.emit(job_id, ev[2].splitlines()[0])
+            return
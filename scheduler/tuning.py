@@ -0,0 +1,276 @@
+# tuning.py - Gurobi parameter sets per instance class
+#
+#   python -m scheduler.tuning data/*.json --method local --time-limit 10
+#
+# Instances are grouped by size, reassignment, staff constraints and
+# unavailability load; the best parameter set found for each class is stored
+# in DEFAULT_TUNING_PATH and applied by build_model (see solver_params).
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import tempfile
+
+from .intervals import build_availability
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TUNING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tuned_params.json")
+
+# a candidate must beat the incumbent set by this fraction of solver work
+MARGIN = 0.05
+
+# local search space; these matter most on the bigM disjunctive model
+SEARCH_SPACE = {
+    'MIPFocus': [0, 1, 2, 3],
+    'Heuristics': [0.05, 0.2, 0.5],
+    'Cuts': [-1, 0, 2],
+    'Presolve': [-1, 2],
+    'Symmetry': [-1, 2],
+}
+
+# never persisted: set per solve by the caller
+_RUNTIME_PARAMS = {'TimeLimit', 'OutputFlag', 'LogToConsole', 'LogFile', 'Threads',
+                   'TuneTimeLimit', 'TuneOutput', 'ObjNumber'}
+
+_cache = {}
+
+
+def classify_instance(tasks, allow_reassign=False, maintenances=None, staff_capacity=None,
+                      opening_hours=None, breaks=None):
+    n = len(tasks)
+    size = 'xs' if n <= 10 else 's' if n <= 30 else 'm' if n <= 80 else 'l'
+    # unavailability load: blocked share of the time the work needs, averaged
+    # over machines (maintenance, closed hours and breaks alike)
+    maint = 'none'
+    if maintenances or opening_hours or breaks:
+        machines = {t.get('machine') for t in tasks if t.get('machine') is not None}
+        for t in tasks:
+            machines.update(t.get('eligible_machines') or [])
+        span = sum(float(t.get('duration', 1.0)) for t in tasks) + max([float(t.get('release', 0.0)) for t in tasks] or [0.0])
+        span = max(span, 1.0)
+        avail = build_availability(span, maintenances, opening_hours, breaks)
+        share = sum(avail.blocked_time(m, 0.0, span) for m in machines) / (span * max(1, len(machines)))
+        maint = 'none' if share == 0 else 'low' if share <= 0.15 else 'high'
+    return f"{size}-reassign{int(bool(allow_reassign))}-staff{int(bool(staff_capacity))}-maint{maint}"
+
+
+def load_tuned(path=DEFAULT_TUNING_PATH):
+    # {class: {'params': {...}, ...}}, re-read only when the file changes
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    if _cache.get(path, (None,))[0] != mtime:
+        with open(path, 'r', encoding='utf-8') as f:
+            _cache[path] = (mtime, json.load(f))
+    return _cache[path][1]
+
+
+def tuned_params_for(tasks, allow_reassign=False, maintenances=None, staff_capacity=None,
+                     opening_hours=None, breaks=None, path=DEFAULT_TUNING_PATH):
+    cls = classify_instance(tasks, allow_reassign, maintenances, staff_capacity, opening_hours, breaks)
+    entry = load_tuned(path).get(cls)
+    return dict(entry['params']) if entry else {}
+
+
+def apply_params(model, params):
+    for name, value in (params or {}).items():
+        model.setParam(name, value)
+
+
+def solver_params(model, tasks, allow_reassign=False, maintenances=None, staff_capacity=None,
+                  opening_hours=None, breaks=None, params=None, tuned=True):
+    # tuned set for the instance class (if any), then explicit params on top
+    applied = tuned_params_for(tasks, allow_reassign, maintenances, staff_capacity, opening_hours, breaks) if tuned else {}
+    applied.update(params or {})
+    apply_params(model, applied)
+    return applied
+
+
+def _instance(inst):
+    # a corpus entry is either a task list or {'tasks', 'allow_reassign', 'maintenances', 'staff_capacity', ...}
+    if isinstance(inst, list):
+        return {'tasks': inst}
+    return dict(inst)
+
+
+def _build(inst, time_limit):
+    from .model import build_model, set_objective
+    data = build_model(inst['tasks'],
+                       time_limit=time_limit,
+                       allow_reassign=inst.get('allow_reassign', False),
+                       maintenances=inst.get('maintenances'),
+                       staff_capacity=inst.get('staff_capacity'),
+                       time_granularity=inst.get('time_granularity', 5),
+                       opening_hours=inst.get('opening_hours'),
+                       breaks=inst.get('breaks'),
+                       tuned=False)
+    set_objective(data, inst.get('objective', 'weighted_completion'), inst.get('penalty_lateness', 0.0))
+    return data.model
+
+
+def _score(model):
+    # deterministic solver work (not wall clock), scaled up by the gap left
+    # when the time limit stopped it
+    from gurobipy import GRB
+    if model.Status == GRB.OPTIMAL:
+        return model.Work
+    gap = model.MIPGap if model.SolCount > 0 else 10.0
+    return model.Work * (2.0 + min(gap, 10.0))
+
+
+def evaluate_params(instances, params, time_limit=10):
+    total = 0.0
+    for inst in instances:
+        model = _build(inst, time_limit)
+        apply_params(model, params)
+        model.optimize()
+        total += _score(model)
+    return total / max(1, len(instances))
+
+
+def _read_prm(path):
+    params = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) != 2 or line.startswith('#') or parts[0] in _RUNTIME_PARAMS:
+                continue
+            try:
+                value = int(parts[1])
+            except ValueError:
+                try:
+                    value = float(parts[1])
+                except ValueError:
+                    value = parts[1]
+            params[parts[0]] = value
+    return params
+
+
+def _tune_gurobi(instances, time_limit, tune_time_limit):
+    # Gurobi's tuner on the largest instance of the class
+    inst = max(instances, key=lambda i: len(i['tasks']))
+    model = _build(inst, time_limit)
+    model.Params.TuneTimeLimit = tune_time_limit
+    model.Params.TuneOutput = 0
+    model.tune()
+    if model.TuneResultCount == 0:
+        return {}
+    model.getTuneResult(0)
+    fd, prm = tempfile.mkstemp(suffix='.prm')
+    os.close(fd)
+    try:
+        model.write(prm)
+        return _read_prm(prm)
+    finally:
+        os.remove(prm)
+
+
+def _tune_local(instances, time_limit, trials, rng):
+    names = sorted(SEARCH_SPACE)
+    grid = list(itertools.product(*(SEARCH_SPACE[n] for n in names)))
+    rng.shuffle(grid)
+    best, best_score = {}, evaluate_params(instances, {}, time_limit)
+    for values in grid[:trials]:
+        params = dict(zip(names, values))
+        score = evaluate_params(instances, params, time_limit)
+        logger.info("Tuning %s: %.4g", params, score)
+        if score < best_score * (1.0 - MARGIN):
+            best, best_score = params, score
+    return best
+
+
+def tune_corpus(instances,
+                method='local',
+                time_limit=10,
+                tune_time_limit=300,
+                trials=20,
+                path=DEFAULT_TUNING_PATH,
+                seed=0):
+    # Groups the corpus by classify_instance, tunes each class and merges the
+    # result into the JSON file at `path`. Returns the classes written.
+    rng = random.Random(seed)
+    classes = {}
+    for inst in map(_instance, instances):
+        cls = classify_instance(inst['tasks'], inst.get('allow_reassign', False), inst.get('maintenances'),
+                                inst.get('staff_capacity'), inst.get('opening_hours'), inst.get('breaks'))
+        classes.setdefault(cls, []).append(inst)
+
+    stored = dict(load_tuned(path))
+    results = {}
+    for cls, members in sorted(classes.items()):
+        logger.info("Tuning class %s (%d instances, %s)", cls, len(members), method)
+        if method == 'gurobi':
+            params = _tune_gurobi(members, time_limit, tune_time_limit)
+        else:
+            params = _tune_local(members, time_limit, trials, rng)
+        score = evaluate_params(members, params, time_limit)
+        entry = {'params': params, 'score': score, 'n_instances': len(members), 'method': method}
+        if cls in stored and stored[cls]['params'] != params:
+            # keep the stored set unless the new one clearly beats it on this corpus
+            old_score = evaluate_params(members, stored[cls]['params'], time_limit)
+            if score >= old_score * (1.0 - MARGIN):
+                logger.info("Class %s: keeping stored parameters (%.4g vs %.4g)", cls, old_score, score)
+                entry = dict(stored[cls], score=old_score, n_instances=len(members))
+        results[cls] = entry
+
+    stored.update(results)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+    return results
+
+
+def generate_instance(n, n_machines=3, seed=0, staff_groups=0, n_maintenances=0, allow_reassign=False):
+    # synthetic corpus entry shaped like the data/ datasets
+    rng = random.Random(seed)
+    machines = [f"M{k + 1}" for k in range(n_machines)]
+    groups = [f"Tech{chr(65 + g)}" for g in range(max(1, staff_groups))]
+    tasks = []
+    for i in range(n):
+        dur = rng.randint(10, 45)
+        rel = rng.randint(0, 10 * n)
+        t = {'id': f"P{i + 1}", 'duration': dur, 'machine': rng.choice(machines),
+             'priority': rng.randint(1, 10), 'release': rel, 'deadline': rel + dur + rng.randint(0, 120),
+             'staff_group': rng.choice(groups)}
+        if i and rng.random() < 0.2:
+            t['setup_after'] = {f"P{rng.randint(1, i)}": rng.choice([5, 10])}
+        tasks.append(t)
+    maint = []
+    for _ in range(n_maintenances):
+        a = rng.randint(0, 10 * n)
+        maint.append({'machine': rng.choice(machines), 'start': a, 'end': a + rng.choice([15, 30, 60])})
+    return {'tasks': tasks, 'allow_reassign': allow_reassign, 'maintenances': maint,
+            'staff_capacity': {g: rng.randint(1, 2) for g in groups} if staff_groups else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tune Gurobi parameters per instance class')
+    parser.add_argument('files', nargs='*', help='JSON task files (as exported by the GUI)')
+    parser.add_argument('--generate', type=int, default=0, help='add N generated instances')
+    parser.add_argument('--method', choices=['local', 'gurobi'], default='local')
+    parser.add_argument('--time-limit', type=float, default=10)
+    parser.add_argument('--tune-time-limit', type=float, default=300)
+    parser.add_argument('--trials', type=int, default=20)
+    parser.add_argument('--output', default=DEFAULT_TUNING_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    corpus = []
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            corpus.append(json.load(f))
+    for k in range(args.generate):
+        corpus.append(generate_instance(n=8 + 4 * (k % 6), n_machines=2 + k % 3, seed=k,
+                                        staff_groups=k % 2 * 2, n_maintenances=k % 4, allow_reassign=k % 3 == 0))
+    results = tune_corpus(corpus, method=args.method, time_limit=args.time_limit,
+                          tune_time_limit=args.tune_time_limit, trials=args.trials, path=args.output)
+    for cls, res in results.items():
+        print(f"{cls:<32} {res['score']:10.4g}  {res['params']}")
+
+
+if __name__ == '__main__':
+    main()
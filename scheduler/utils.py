@@ -1,12 +1,13 @@
 import json
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-
 import logging
 import os
 from datetime import datetime
 
+# matplotlib is imported inside the export functions: logging and JSON export
+# must not pay for the plotting stack, and the GUI loads it only on first PDF.
+
+ROWS_PER_PAGE = 30
+
 def setup_logging(log_dir="logs"):
     os.makedirs(log_dir, exist_ok=True)
     logging.basicConfig(
@@ -22,68 +23,77 @@ def export_json(tasks, path):
     with open(path,'w',encoding='utf-8') as f:
         json.dump(tasks,f,indent=2)
 
-def export_pdf(solution, path):
-    with PdfPages(path) as pdf:
-        fig, ax = plt.subplots(figsize=(11,6))
-        machines = sorted(list({s['machine'] for s in solution}))
-        machine_to_idx = {m:i for i,m in enumerate(machines)}
-        palette = [plt.cm.tab20(i%20) for i in range(len(machines))]
+def _draw_gantt(ax, solution):
+    import matplotlib
+    machines = sorted(list({s['machine'] for s in solution}))
+    machine_to_idx = {m:i for i,m in enumerate(machines)}
+    cmap = matplotlib.colormaps['tab20']
+    palette = [cmap(i%20) for i in range(len(machines))]
+    for s in solution:
+        if s['start'] is None: continue
+        mi = machine_to_idx[s['machine']]
+        ax.barh(mi, s['duration'], left=s['start'], height=0.5, edgecolor='black', color=palette[mi])
+        ax.text(s['start']+s['duration']/2, mi, str(s['id']), va='center', ha='center', color='white', fontsize=8)
+    ax.set_yticks(range(len(machines)))
+    ax.set_yticklabels(machines)
+    ax.set_xlabel('Temps (minutes)')
+    ax.invert_yaxis()
 
-        for s in solution:
-            if s['start'] is None: continue
-            mi = machine_to_idx[s['machine']]
-            ax.barh(mi, s['duration'], left=s['start'], height=0.5, edgecolor='black', color=palette[mi])
-            ax.text(s['start']+s['duration']/2, mi, str(s['id']), va='center', ha='center', color='white', fontsize=8)
+def _n_table_pages(rows):
+    return max(1, -(-len(rows) // ROWS_PER_PAGE))
 
-        ax.set_yticks(range(len(machines)))
-        ax.set_yticklabels(machines)
-        ax.set_xlabel('Temps (minutes)')
-        ax.set_title('Diagramme de Gantt - Planning patients')
-        ax.invert_yaxis()
-        pdf.savefig(fig)
-        plt.close(fig)
-
-        df = pd.DataFrame([{'ID':s['id'],'Machine':s['machine'],'Start':s['start'],'End':s['end'],'Staff':s.get('staff_group','')} for s in solution])
-        fig2, ax2 = plt.subplots(figsize=(11,6))
-        ax2.axis('off')
-        tbl = ax2.table(cellText=df.values, colLabels=df.columns, loc='center')
+def _table_pages(pdf, columns, rows, title, progress=None, done=0, total=None):
+    # one page per ROWS_PER_PAGE rows; progress(done, total) after each page
+    from matplotlib.figure import Figure
+    n_pages = _n_table_pages(rows)
+    for page in range(n_pages):
+        chunk = rows[page*ROWS_PER_PAGE:(page+1)*ROWS_PER_PAGE]
+        fig = Figure(figsize=(11,6))
+        ax = fig.subplots()
+        ax.axis('off')
+        tbl = ax.table(cellText=chunk or [['']*len(columns)], colLabels=columns, loc='center')
         tbl.auto_set_font_size(False)
         tbl.set_fontsize(8)
         tbl.scale(1,1.5)
-        ax2.set_title('Détail des tâches')
-        pdf.savefig(fig2)
-        plt.close(fig2)
+        ax.set_title(title if n_pages == 1 else f'{title} ({page+1}/{n_pages})')
+        pdf.savefig(fig)
+        if progress:
+            progress(done + page + 1, total)
 
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
+def export_pdf(solution, path, progress=None):
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+    with PdfPages(path) as pdf:
+        fig = Figure(figsize=(11,6))
+        ax = fig.subplots()
+        _draw_gantt(ax, solution)
+        ax.set_title('Diagramme de Gantt - Planning patients')
+        pdf.savefig(fig)
+
+        rows = [[s['id'], s['machine'], s['start'], s['end'], s.get('staff_group','')] for s in solution]
+        total = 1 + _n_table_pages(rows)
+        if progress:
+            progress(1, total)
+        _table_pages(pdf, ['ID','Machine','Start','End','Staff'], rows, 'Détail des tâches', progress, 1, total)
+
+def export_compare_pdf(results: dict, left_obj: str, right_obj: str, path: str, progress=None):
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
 
-def export_compare_pdf(results: dict, left_obj: str, right_obj: str, path: str):
-   
     left_sol, left_val = results[left_obj]
     right_sol, right_val = results[right_obj]
 
     with PdfPages(path) as pdf:
         # --- First page: two Gantt charts side by side ---
-        fig, axs = plt.subplots(1, 2, figsize=(16,6), sharey=True)
+        fig = Figure(figsize=(16,6))
+        axs = fig.subplots(1, 2, sharey=True)
         for ax, sol, obj_name, val in zip(axs, [left_sol, right_sol], [left_obj, right_obj], [left_val, right_val]):
-            machines = sorted(list({s['machine'] for s in sol}))
-            machine_to_idx = {m:i for i,m in enumerate(machines)}
-            palette = [plt.cm.tab20(i%20) for i in range(len(machines))]
-            for s in sol:
-                if s['start'] is None: continue
-                mi = machine_to_idx[s['machine']]
-                ax.barh(mi, s['duration'], left=s['start'], height=0.5, edgecolor='black', color=palette[mi])
-                ax.text(s['start']+s['duration']/2, mi, str(s['id']), va='center', ha='center', color='white', fontsize=8)
-            ax.set_yticks(range(len(machines)))
-            ax.set_yticklabels(machines)
-            ax.set_xlabel('Temps (minutes)')
-            ax.set_title(f'{obj_name} - Obj {val:.2f}')
-            ax.invert_yaxis()
+            _draw_gantt(ax, sol)
+            ax.set_title(f'{obj_name} - Obj {val:.2f}' if val is not None else obj_name)
         pdf.savefig(fig)
-        plt.close(fig)
+        if progress:
+            progress(1, None)
 
-       
         map_left = {s['id']: s for s in (left_sol or [])}
         map_right = {s['id']: s for s in (right_sol or [])}
         ids = sorted(set(map_left.keys()).union(map_right.keys()))
@@ -99,14 +109,6 @@ def export_compare_pdf(results: dict, left_obj: str, right_obj: str, path: str):
                 delta = f"{(rstart - lstart):.2f}"
             data.append([tid, f"{lstart:.2f}" if lstart is not None else '', f"{rstart:.2f}" if rstart is not None else '', dur, delta])
 
-        df = pd.DataFrame(data, columns=['ID', f'Start ({left_obj})', f'Start ({right_obj})', 'Duration', 'Delta Start'])
-
-        fig2, ax2 = plt.subplots(figsize=(11,6))
-        ax2.axis('off')
-        tbl = ax2.table(cellText=df.values, colLabels=df.columns, loc='center')
-        tbl.auto_set_font_size(False)
-        tbl.set_fontsize(8)
-        tbl.scale(1,1.5)
-        ax2.set_title('Comparaison des tâches et delta start')
-        pdf.savefig(fig2)
-        plt.close(fig2)
+        columns = ['ID', f'Start ({left_obj})', f'Start ({right_obj})', 'Duration', 'Delta Start']
+        total = 1 + _n_table_pages(data)
+        _table_pages(pdf, columns, data, 'Comparaison des tâches et delta start', progress, 1, total)
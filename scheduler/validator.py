@@ -0,0 +1,170 @@
+# validator.py - independent check of a schedule (solution dict list)
+import logging
+import numpy as np
+
+from .intervals import build_availability
+
+logger = logging.getLogger(__name__)
+
+
+def _violation(kind, message, task_ids=(), machine=None, amount=0.0):
+    return {'type': kind, 'message': message, 'task_ids': list(task_ids),
+            'machine': machine, 'amount': float(amount)}
+
+
+def _float_or_nan(val):
+    if val in [None, '']:
+        return np.nan
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def validate_schedule(solution,
+                      tasks=None,
+                      maintenances=None,
+                      staff_capacity=None,
+                      opening_hours=None,
+                      breaks=None,
+                      tol=1e-6):
+    # Checks machine non-overlap, setup_after precedences, releases,
+    # unavailability windows and staff capacity in O(n log n), independently
+    # of the MIP. tasks (the input rows) supply releases, deadlines and
+    # setup_after; without them only the schedule itself is checked.
+    # Returns {'ok', 'violations': [...], 'kpis': {...}}.
+    violations = []
+    placed = [s for s in solution if s.get('start') is not None]
+    task_by_id = {t['id']: t for t in (tasks or [])}
+    if tasks is not None:
+        placed_ids = {s['id'] for s in placed}
+        missing = [t['id'] for t in tasks if t['id'] not in placed_ids]
+        if missing:
+            violations.append(_violation('unscheduled', f"{len(missing)} tâche(s) non planifiée(s)", missing))
+
+    n = len(placed)
+    ids = [s['id'] for s in placed]
+    start = np.fromiter((s['start'] for s in placed), dtype=float, count=n)
+    dur = np.fromiter((s['duration'] for s in placed), dtype=float, count=n)
+    end = np.fromiter((s['end'] if s.get('end') is not None else s['start'] + s['duration'] for s in placed),
+                      dtype=float, count=n)
+    prio = np.fromiter((s.get('priority', 1.0) for s in placed), dtype=float, count=n)
+    machines = [s.get('machine') for s in placed]
+
+    bad = np.nonzero(np.abs(end - start - dur) > tol)[0]
+    for j in bad:
+        violations.append(_violation('duration', f"{ids[j]}: fin - début != durée", [ids[j]], machines[j], end[j] - start[j] - dur[j]))
+
+    # releases and deadlines from the task rows
+    release = np.fromiter((_float_or_nan(task_by_id.get(tid, {}).get('release')) for tid in ids), dtype=float, count=n)
+    deadline = np.fromiter((_float_or_nan(task_by_id.get(tid, {}).get('deadline')) for tid in ids), dtype=float, count=n)
+    early = np.nonzero(start < np.nan_to_num(release, nan=-np.inf) - tol)[0]
+    for j in early:
+        violations.append(_violation('release', f"{ids[j]} commence avant sa release", [ids[j]], machines[j], release[j] - start[j]))
+
+    # machine non-overlap: sort by (machine, start), running max of end per machine
+    m_names = sorted({m for m in machines if m is not None}, key=str)
+    m_code = {m: k for k, m in enumerate(m_names)}
+    code = np.fromiter((m_code.get(m, -1) for m in machines), dtype=np.int64, count=n)
+    order = np.lexsort((start, code))
+    bounds = np.searchsorted(code[order], np.arange(len(m_names) + 1))
+    busy = {}
+    span = {}
+    for k, m in enumerate(m_names):
+        idx = order[bounds[k]:bounds[k + 1]]
+        if len(idx) == 0:
+            continue
+        s_m, e_m = start[idx], end[idx]
+        busy[m] = float(dur[idx].sum())
+        span[m] = (float(s_m[0]), float(e_m.max()))
+        if len(idx) < 2:
+            continue
+        run_max = np.maximum.accumulate(e_m)
+        pos = np.arange(len(idx))
+        arg_max = np.maximum.accumulate(np.where(e_m == run_max, pos, 0))
+        clash = np.nonzero(s_m[1:] < run_max[:-1] - tol)[0]
+        for c in clash:
+            a, b = idx[arg_max[c]], idx[c + 1]
+            violations.append(_violation('overlap', f"{ids[a]} et {ids[b]} se chevauchent sur {m}",
+                                         [ids[a], ids[b]], m, run_max[c] - s_m[c + 1]))
+
+    # setup_after: hard precedence (task starts after the other ends + setup)
+    pos_of = {tid: j for j, tid in enumerate(ids)}
+    pairs = [(pos_of[tid], pos_of[other], float(st))
+             for tid in ids for other, st in (task_by_id.get(tid, {}).get('setup_after') or {}).items()
+             if other in pos_of and float(st) > 0]
+    if pairs:
+        pi, pk, ps = (np.array(v) for v in zip(*pairs))
+        pi, pk = pi.astype(np.int64), pk.astype(np.int64)
+        gap = start[pi] - (end[pk] + ps)
+        for j in np.nonzero(gap < -tol)[0]:
+            a, b = pi[j], pk[j]
+            violations.append(_violation('setup', f"{ids[a]} doit attendre {ps[j]:g} min après {ids[b]}",
+                                         [ids[a], ids[b]], machines[a], -gap[j]))
+
+    # unavailability windows: first block ending after the start must begin after the end
+    makespan = float(end.max()) if n else 0.0
+    if maintenances or opening_hours or breaks:
+        avail = build_availability(makespan + 1.0, maintenances, opening_hours, breaks)
+        for k, m in enumerate(m_names):
+            blocks = avail.blocks(m)
+            if not blocks:
+                continue
+            b_start = np.array([b[0] for b in blocks])
+            b_end = np.array([b[1] for b in blocks])
+            idx = order[bounds[k]:bounds[k + 1]]
+            first = np.searchsorted(b_end, start[idx] + tol, side='right')
+            valid = first < len(blocks)
+            hit = np.zeros(len(idx), dtype=bool)
+            hit[valid] = b_start[first[valid]] < end[idx][valid] - tol
+            for j in np.nonzero(hit)[0]:
+                blk = blocks[first[j]]
+                violations.append(_violation('maintenance', f"{ids[idx[j]]} empiète sur {', '.join(blk[2])} ({m})",
+                                             [ids[idx[j]]], m, min(end[idx[j]], blk[1]) - max(start[idx[j]], blk[0])))
+
+    # staff: sweep line over +1 / -1 events, ends sorted before starts at equal time
+    groups = [s.get('staff_group') for s in placed]
+    staff_kpis = {}
+    for grp in sorted({g for g in groups if g}, key=str):
+        sel = np.fromiter((g == grp for g in groups), dtype=bool, count=n)
+        times = np.concatenate([start[sel], end[sel]])
+        delta = np.concatenate([np.ones(sel.sum()), -np.ones(sel.sum())])
+        ev = np.lexsort((delta, times))
+        level = np.cumsum(delta[ev])
+        peak = int(level.max()) if len(level) else 0
+        cap = (staff_capacity or {}).get(grp)
+        g_busy = float(dur[sel].sum())
+        staff_kpis[grp] = {'busy': g_busy, 'peak': peak,
+                           'utilization': g_busy / (float(cap) * makespan) if cap and makespan > 0 else None}
+        if cap is not None and peak > int(cap):
+            over = np.nonzero(level > int(cap))[0]
+            t0 = float(times[ev][over[0]])
+            active = [ids[j] for j in np.nonzero(sel & (start <= t0 + tol) & (end > t0 + tol))[0]]
+            violations.append(_violation('staff', f"{grp}: {peak} tâches simultanées pour une capacité de {cap} (t={t0:g})",
+                                         active, None, peak - int(cap)))
+
+    # KPIs
+    late = np.maximum(0.0, end - deadline)
+    late = np.where(np.isnan(late), 0.0, late)
+    machine_kpis = {}
+    for m in busy:
+        first_s, last_e = span[m]
+        machine_kpis[m] = {'busy': busy[m],
+                           'idle': max(0.0, (last_e - first_s) - busy[m]),
+                           'utilization': busy[m] / makespan if makespan > 0 else 0.0}
+    kpis = {
+        'makespan': makespan,
+        'total_lateness': float(late.sum()),
+        'weighted_lateness': float((prio * late).sum()),
+        'late_tasks': int((late > tol).sum()),
+        'weighted_completion': float((prio * end).sum()),
+        'machines': machine_kpis,
+        'staff': staff_kpis,
+    }
+    return {'ok': not violations, 'violations': violations, 'kpis': kpis}
+
+
+def log_violations(report, context='schedule'):
+    for v in report['violations']:
+        logger.warning("%s: %s", context, v['message'])
+    return report['ok']